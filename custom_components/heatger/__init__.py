@@ -8,7 +8,7 @@ from .api.ha_api import async_register_api
 from .const import DOMAIN, IP
 from .local_storage.config.config import Config
 from .local_storage.persistence.persistence import Persistence
-from .shared.logs.logs import Logs
+from .shared.timer.scheduler import Scheduler
 from .websocket.ws_client import WSClient
 from .websocket.ws_ha import async_register_ws
 from .zone.zone_manager import ZoneManager
@@ -28,12 +28,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data[DOMAIN]['zone_manager'] = zone_manager
     await zone_manager.run()
 
-    try:
-        ws = WSClient(hass, zone_manager.get_all_data, zone_manager.updated_state)
-        hass.data[DOMAIN]['WS'] = ws
-        await ws.connect()
-    except Exception as e:
-        Logs.error('WS', e)
+    ws = WSClient(hass, zone_manager.get_all_data, zone_manager.updated_state)
+    hass.data[DOMAIN]['WS'] = ws
+    # the server is not waited, the sensors are registered from the cached server config, connection
+    # errors are handled by the reconnect loop of start()
+    entry.async_create_background_task(hass, ws.start(), 'heatger_ws_start')
 
     await async_register_panel(hass)
     await async_register_api(hass)
@@ -46,10 +45,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload Heatger"""
+    await Persistence(hass).async_flush()
+    # the reconnect timer, writer, dispatcher and socket must not outlive the entry
+    ws: WSClient = hass.data[DOMAIN].pop('WS', None)
+    if ws:
+        await ws.disconnect()
     zone_manager: ZoneManager = hass.data.get(DOMAIN)['zone_manager']
     if zone_manager:
         await zone_manager.stop_loop()
-        hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+    Scheduler().stop()
 
     await async_unregister_panel(hass)
 
@@ -1,3 +1,6 @@
+from http import HTTPStatus
+
+from aiohttp import web
 from homeassistant.components.http.data_validator import RequestDataValidator
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.http import HomeAssistantView
@@ -7,8 +10,10 @@ import voluptuous as vol
 from custom_components.heatger import const as c
 from custom_components.heatger.zone.zone_manager import ZoneManager
 from custom_components.heatger.local_storage.config.config import Config
+from custom_components.heatger.local_storage.config.errors.config_error import ConfigError
 from custom_components.heatger.shared.enum.state import State
 from custom_components.heatger.shared.logs.logs import Logs
+from custom_components.heatger.shared.metrics.metrics import Metrics
 from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
 
 DAYS = [0, 1, 2, 3, 4, 5, 6]
@@ -39,10 +44,42 @@ class HeatgerAddProgView(HomeAssistantView):
     )
     async def post(self, request, data):
         hass = request.app["hass"]
-        await Config(hass).add_schedules(data['zone_id'], ScheduleDto.from_array(data['prog']))
-        manager: ZoneManager = hass.data[c.DOMAIN]['zone_manager']
-        await manager.init_zones()
-        return self.json({"success": True})
+        rejected = await Config(hass).add_schedules(data['zone_id'], ScheduleDto.from_array(data['prog']))
+        return self.json({"success": True, "rejected": [schedule.to_object() for schedule in rejected]})
+
+
+class HeatgerReplaceProgView(HomeAssistantView):
+    """Endpoint to replace the programs of several zones."""
+
+    url = "/api/heatger/prog/replace"
+    name = "api:heatger:prog:replace"
+
+    @RequestDataValidator(
+        vol.Schema(
+            {
+                vol.Required('progs'): {
+                    cv.string: vol.All(
+                        cv.ensure_list,
+                        [
+                            {
+                                vol.Required('day'): vol.In(DAYS),
+                                vol.Required('hour'): cv.string,
+                                vol.Required('state'): vol.In(State)
+                            }
+                        ]
+                    )
+                }
+            }
+        )
+    )
+    async def post(self, request, data):
+        hass = request.app["hass"]
+        try:
+            progs = {zone_id: ScheduleDto.from_array(prog) for zone_id, prog in data['progs'].items()}
+            changed = await Config(hass).replace_progs(progs)
+        except (ConfigError, ValueError, IndexError) as e:
+            return self.json_message(str(e), HTTPStatus.BAD_REQUEST)
+        return self.json({"success": True, "changed": changed})
 
 
 class HeatgerRemoveProgView(HomeAssistantView):
@@ -68,8 +105,6 @@ class HeatgerRemoveProgView(HomeAssistantView):
     async def post(self, request, data):
         hass = request.app["hass"]
         await Config(hass).remove_schedule(data['zone_id'], ScheduleDto.from_dict(data['prog']))
-        manager: ZoneManager = hass.data[c.DOMAIN]['zone_manager']
-        await manager.init_zones()
         return self.json({"success": True})
 
 
@@ -89,8 +124,6 @@ class HeatgerRemoveAllProgView(HomeAssistantView):
     async def post(self, request, data):
         hass = request.app["hass"]
         await Config(hass).remove_all_schedule(data['zone_id'])
-        manager: ZoneManager = hass.data[c.DOMAIN]['zone_manager']
-        await manager.init_zones()
         return self.json({"success": True})
 
 
@@ -149,8 +182,6 @@ class HeatgerAddZoneView(HomeAssistantView):
         hass = request.app["hass"]
         await Config(hass).add_zone(data['zone'])
         Logs.info('CONFIG', hass.data.get(c.DOMAIN))
-        manager: ZoneManager = hass.data.get(c.DOMAIN)['zone_manager']
-        await manager.init_zones()
         return self.json({"success": True})
 
 
@@ -170,8 +201,6 @@ class HeatgerRemoveZoneView(HomeAssistantView):
     async def post(self, request, data):
         hass: HomeAssistant = request.app["hass"]
         await Config(hass).remove_zone(data['zone'])
-        manager: ZoneManager = hass.data[c.DOMAIN]['zone_manager']
-        await manager.init_zones()
         return self.json({"success": True})
 
 
@@ -208,8 +237,19 @@ class HeatgerDeactivateFrostfreeView(HomeAssistantView):
         return self.json({"success": True})
 
 
+class HeatgerMetricsView(HomeAssistantView):
+    """Endpoint to scrape the metrics in the Prometheus text format."""
+
+    url = "/api/heatger/metrics"
+    name = "api:heatger:metrics"
+
+    async def get(self, request):
+        return web.Response(text=Metrics().to_text(), content_type='text/plain')
+
+
 async def async_register_api(hass):
     hass.http.register_view(HeatgerAddProgView)
+    hass.http.register_view(HeatgerReplaceProgView)
     hass.http.register_view(HeatgerRemoveProgView)
     hass.http.register_view(HeatgerRemoveAllProgView)
     hass.http.register_view(HeatgerAddUserView)
@@ -218,3 +258,4 @@ async def async_register_api(hass):
     hass.http.register_view(HeatgerRemoveZoneView)
     hass.http.register_view(HeatgerActivateFrostfreeView)
     hass.http.register_view(HeatgerDeactivateFrostfreeView)
+    hass.http.register_view(HeatgerMetricsView)
@@ -7,9 +7,9 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries, exceptions
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 
-from .const import DOMAIN, IP, PORT
+from .const import DOMAIN, IP, PORT, DEADBAND, MIN_INTERVAL, DEFAULT_DEADBANDS, DEFAULT_MIN_INTERVAL
 from .local_storage.config.config import Config
 from .websocket.ws_client import WSClient
 
@@ -82,6 +82,30 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=DATA_SCHEMA, errors=errors,
         )
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the options flow"""
+        return OptionsFlowHandler()
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the sensors write filters"""
+
+    async def async_step_init(self, user_input=None):
+        """Manage the deadband of each sensor and the min interval between two writes"""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        schema = {}
+        for name, default in DEFAULT_DEADBANDS.items():
+            key = F'{name}_{DEADBAND}'
+            schema[vol.Required(key, default=options.get(key, default))] = vol.All(vol.Coerce(float), vol.Range(min=0))
+        schema[vol.Required(MIN_INTERVAL, default=options.get(MIN_INTERVAL, DEFAULT_MIN_INTERVAL))] = \
+            vol.All(vol.Coerce(int), vol.Range(min=0))
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(schema))
+
 
 class CannotConnect(exceptions.HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -3,3 +3,14 @@
 DOMAIN = "heatger"
 IP = "ip"
 PORT = "port"
+
+# sensors write filters, configurable in the integration options
+DEADBAND = "deadband"
+MIN_INTERVAL = "min_interval"
+DEFAULT_DEADBANDS = {
+    "temperature": 0.1,
+    "humidity": 0.5,
+    "pressure": 0.5,
+    "electric_meter": 0,
+}
+DEFAULT_MIN_INTERVAL = 10
@@ -1,6 +1,8 @@
 """Coordinator class"""
 import logging
+from typing import Any, Callable
 
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from custom_components.heatger.const import DOMAIN
@@ -18,3 +20,22 @@ class SensorCoordinator(DataUpdateCoordinator):
             _LOGGER,
             name=DOMAIN,
         )
+        self._values: dict[str, Any] = {}
+        self._key_listeners: dict[str, list[Callable[[Any], None]]] = {}
+
+    @callback
+    def async_add_key_listener(self, key: str, update_callback: Callable[[Any], None]) -> Callable[[], None]:
+        """Call update_callback with the new value each time the value of key changes"""
+        self._key_listeners.setdefault(key, []).append(update_callback)
+        return lambda: self._key_listeners[key].remove(update_callback)
+
+    @callback
+    def async_set_updated_values(self, values: dict[str, Any]) -> None:
+        """Store the values, only the listeners of the changed keys are called"""
+        self.data = values
+        for key, value in values.items():
+            if key in self._values and self._values[key] == value:
+                continue
+            self._values[key] = value
+            for update_callback in self._key_listeners.get(key, ()):
+                update_callback(value)
@@ -0,0 +1,21 @@
+"""Diagnostics support for Heatger."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .shared.metrics.metrics import Metrics
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return the metrics of the integration."""
+    zone_manager = hass.data.get(DOMAIN, {}).get('zone_manager')
+    return {
+        'metrics': Metrics().to_object(),
+        'zones': len(zone_manager.zones) if zone_manager else 0,
+        'zones_init_ms': {zone_id: round(duration * 1000, 1)
+                          for zone_id, duration in zone_manager.init_durations.items()} if zone_manager else {},
+    }
@@ -1,15 +1,22 @@
 """Config class"""
-from typing import Optional
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Coroutine, Optional
 
+from custom_components.heatger.local_storage.config.config_store import ConfigStore
 from custom_components.heatger.local_storage.config.dto.config_dto import ConfigDto
 from custom_components.heatger.local_storage.config.errors.already_exist_error import AlreadyExistError
-from custom_components.heatger.local_storage.config.errors.config_error import ConfigError
 from custom_components.heatger.local_storage.config.errors.schedule_not_valid_error import ScheduleNotValidError
 from custom_components.heatger.local_storage.config.errors.zone_not_found_error import ZoneNotFoundError
+from custom_components.heatger.local_storage.consts import CONFIG_STORE_VERSION
 from custom_components.heatger.local_storage.errors.missing_arg_error import MissingArgError
+from custom_components.heatger.local_storage.json_encoder.serializer import config_to_storage, dumps
 from custom_components.heatger.local_storage.local_storage import LocalStorage
 from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
 from custom_components.heatger.zone.dto.zone_dto import ZoneDto
+from custom_components.heatger.zone.schedule_index import ScheduleIndex
+from custom_components.heatger.zone.schedule_list import ScheduleList
 
 
 class Config(LocalStorage):
@@ -25,12 +32,22 @@ class Config(LocalStorage):
     def __init__(self, hass):
         if Config._initialized:
             return
-        super().__init__(hass, 'config')
+        super().__init__(hass, 'config', CONFIG_STORE_VERSION, ConfigStore)
         self.data: Optional[ConfigDto] = None
+        self._indexes: dict[str, ScheduleIndex] = {}
+        self._lock = asyncio.Lock()
+        self._working: Optional[ConfigDto] = None
+        self._owner: Optional[asyncio.Task] = None
+        self._listeners: list[Callable[[set[str]], Coroutine]] = []
+        # seeded with the start time, a revision given by a client before a restart never matches
+        self.revision = int(time.time() * 1000)
+        self._encoded: dict[str, str] = {}
         Config._initialized = True
 
     async def get_config(self) -> ConfigDto:
-        """Return a ConfigDto object"""
+        """Return a ConfigDto object, the working copy inside a transaction"""
+        if self._working is not None and self._owner is asyncio.current_task():
+            return self._working
         if self.data:
             return self.data
         try:
@@ -43,115 +60,184 @@ class Config(LocalStorage):
             raise MissingArgError() from exc
         return self.data
 
-    async def __save_data(self, config) -> None:
-        """Write a ConfigDto object to file"""
-        self.data = config
-        await self._write(config)
+    def _to_storage(self, data: ConfigDto) -> dict:
+        return config_to_storage(data)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[ConfigDto]:
+        """Group mutations on a working copy, validated and committed with a single write.
+        Mutations called inside an open transaction of the same task join it"""
+        if self._working is not None and self._owner is asyncio.current_task():
+            yield self._working
+            return
+
+        async with self._lock:
+            committed = await self.get_config()
+            self._working = ConfigDto(dict(committed.zones), list(committed.users), committed.ws_url)
+            self._owner = asyncio.current_task()
+            try:
+                yield self._working
+                changed_zones = await self.__commit(committed, self._working)
+            finally:
+                self._working = None
+                self._owner = None
+        if changed_zones is not None:
+            await self.__notify(changed_zones)
+
+    async def __commit(self, committed: ConfigDto, working: ConfigDto) -> Optional[set[str]]:
+        """Validate and write the working copy, return the ids of the changed zones"""
+        # zones are renumbered zone1..zoneN, like on a reload
+        working = ConfigDto(working.zones, working.users, working.ws_url)
+        changed_zones = {zone_id for zone_id, zone in working.zones.items()
+                         if committed.zones.get(zone_id) is not zone}
+        changed_zones.update(zone_id for zone_id in committed.zones if zone_id not in working.zones)
+        if not changed_zones and working.users == committed.users and working.ws_url == committed.ws_url:
+            return None
+        for zone_id in changed_zones:
+            if zone_id in working.zones:
+                Config.__validate_zone(working.zones[zone_id])
+
+        await self._write(working)
+        self.data = working
+        self.revision += 1
+        self._encoded.clear()
+        for zone_id in changed_zones:
+            if zone_id not in working.zones:
+                self._indexes.pop(zone_id, None)
+            elif zone_id in self._indexes:
+                self._indexes[zone_id].load(working.zones[zone_id].prog)
+        return changed_zones
+
+    @staticmethod
+    def __validate_zone(zone: ZoneDto) -> None:
+        """Raise a ConfigError if the prog of the zone is not valid"""
+        if not all(schedule.is_valid_schedule() for schedule in zone.prog):
+            raise ScheduleNotValidError()
+        if zone.prog.has_duplicates():
+            raise AlreadyExistError('Schedule')
+
+    def add_listener(self, listener: Callable[[set[str]], Coroutine]) -> Callable[[], None]:
+        """Call listener with the ids of the changed zones after each commit, return a function to remove it"""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    async def __notify(self, changed_zones: set[str]) -> None:
+        """Call the listeners once per commit"""
+        for listener in list(self._listeners):
+            await listener(changed_zones)
+
+    @staticmethod
+    def __edit_zone(config: ConfigDto, zone_id: str) -> ZoneDto:
+        """Replace the zone of the working copy by a copy that can be modified"""
+        zone = config.zones[zone_id]
+        zone = ZoneDto(zone.name, zone.enabled, zone.prog)
+        config.zones[zone_id] = zone
+        return zone
 
     async def add_user(self, user) -> None:
         """Add user to scanned users list"""
         if user == '':
             return
-        config = await self.get_config()
-        users = config.users
-        users_list = users
-        if not all(user_in_list != user for user_in_list in users_list):
-            raise AlreadyExistError(user.ip)
-
-        users_list.append(user)
-        await self.__save_data(config)
+        async with self.transaction() as config:
+            if user in config.users:
+                raise AlreadyExistError(user)
+            config.users.append(user)
 
     async def remove_user(self, user) -> None:
         """Remove user from scanned users list"""
-        config = await self.get_config()
-        users = config.users
-        users.remove(user)
-        await self.__save_data(config)
+        async with self.transaction() as config:
+            config.users.remove(user)
 
     async def add_schedule(self, zone_id: str, schedule: ScheduleDto) -> None:
         """Add schedule to prog list"""
         if not schedule.is_valid_schedule():
             raise ScheduleNotValidError()
-        if not await self.__is_zone_exist(zone_id):
-            raise ZoneNotFoundError(zone_id)
+        async with self.transaction() as config:
+            if not await self.__is_zone_exist(zone_id):
+                raise ZoneNotFoundError(zone_id)
+            if not Config.__edit_zone(config, zone_id).prog.add(schedule):
+                raise AlreadyExistError('Schedule')
 
-        config = await self.get_config()
-        zone = config.zones[zone_id]
-        prog: list[ScheduleDto] = zone.prog
+    async def add_schedules(self, zone_id: str, schedules: [ScheduleDto]) -> list[ScheduleDto]:
+        """Add schedules list to prog list with a single sort and write, return the rejected schedules"""
+        async with self.transaction() as config:
+            if not await self.__is_zone_exist(zone_id):
+                raise ZoneNotFoundError(zone_id)
 
-        if not all(sch.to_value() != schedule.to_value() for sch in prog):
-            raise AlreadyExistError('Schedule')
-        prog.append(schedule)
-        prog.sort(key=Config._sort_schedule)
-        await self.__save_data(config)
+            prog = config.zones[zone_id].prog
+            values = set()
+            accepted: list[ScheduleDto] = []
+            rejected: list[ScheduleDto] = []
+            for schedule in schedules:
+                if not schedule.is_valid_schedule() or schedule.to_minutes() in values or schedule in prog:
+                    rejected.append(schedule)
+                    continue
+                values.add(schedule.to_minutes())
+                accepted.append(schedule)
+            if not accepted:
+                return rejected
 
-    async def add_schedules(self, zone_id: str, schedules: [ScheduleDto]) -> None:
-        """Add schedules list to prog list"""
-        if not await self.__is_zone_exist(zone_id):
-            raise ZoneNotFoundError(zone_id)
-        for schedule in schedules:
-            try:
-                await self.add_schedule(zone_id, schedule)
-            except ConfigError:
-                pass
+            Config.__edit_zone(config, zone_id).prog.update(accepted)
+        return rejected
 
-    @staticmethod
-    def _sort_schedule(schedule: ScheduleDto) -> int:
-        """Return schedule to a value"""
-        return ScheduleDto(schedule.day, schedule.hour, schedule.state).to_value()
+    async def replace_progs(self, progs: dict[str, list[ScheduleDto]]) -> list[str]:
+        """Replace the prog list of several zones at once, return the ids of the zones changed.
+        Every prog is validated before any change, nothing is written if one of them is not valid"""
+        sorted_progs: dict[str, ScheduleList] = {}
+        for zone_id, schedules in progs.items():
+            if not all(schedule.is_valid_schedule() for schedule in schedules):
+                raise ScheduleNotValidError()
+            sorted_progs[zone_id] = ScheduleList(schedules)
+            if sorted_progs[zone_id].has_duplicates():
+                raise AlreadyExistError('Schedule')
+
+        changed = []
+        async with self.transaction() as config:
+            # checked on the working copy, a zone removed meanwhile renumbers the next ones
+            for zone_id in sorted_progs:
+                if zone_id not in config.zones:
+                    raise ZoneNotFoundError(zone_id)
+            for zone_id, prog in sorted_progs.items():
+                if config.zones[zone_id].prog == prog:
+                    continue
+                Config.__edit_zone(config, zone_id).prog = prog
+                changed.append(zone_id)
+        return changed
 
     async def remove_schedule(self, zone_id: str, schedule: ScheduleDto) -> None:
         """Remove schedule from prog list"""
         if not schedule.is_valid_schedule():
             raise ScheduleNotValidError()
-        if not await self.__is_zone_exist(zone_id):
-            raise ZoneNotFoundError(zone_id)
-
-        config = await self.get_config()
-        zone = config.zones[zone_id]
-        prog = zone.prog
-        prog.remove(schedule)
-        await self.__save_data(config)
+        async with self.transaction() as config:
+            if not await self.__is_zone_exist(zone_id):
+                raise ZoneNotFoundError(zone_id)
+            Config.__edit_zone(config, zone_id).prog.remove(schedule)
 
     async def remove_all_schedule(self, zone_id: str) -> None:
         """Remove all schedules from prog list"""
-        if not await self.__is_zone_exist(zone_id):
-            raise ZoneNotFoundError(zone_id)
-        config = await self.get_config()
-        zone = config.zones[zone_id]
-        prog = zone.prog
-        prog.clear()
-        zone.prog = prog
-
-        setattr(await self.get_config(), zone_id, zone)
-        await self.__save_data(config)
+        async with self.transaction() as config:
+            if not await self.__is_zone_exist(zone_id):
+                raise ZoneNotFoundError(zone_id)
+            Config.__edit_zone(config, zone_id).prog.clear()
 
     async def add_zone(self, name: str) -> None:
-        """"""
+        """Add a new zone with an empty prog"""
         if name == '':
             return
-        config = await self.get_config()
-        for [key, zone] in config.zones.items():
-            if zone.name == name:
-                return
-
-        config.zones[F'zone{len(config.zones.items())+1}'] = ZoneDto(name, True, [])
-
-        await self.__save_data(config)
+        async with self.transaction() as config:
+            for zone in config.zones.values():
+                if zone.name == name:
+                    return
+            config.zones[F'zone{len(config.zones) + 1}'] = ZoneDto(name, True, [])
 
     async def remove_zone(self, name: str) -> None:
-        """"""
+        """Remove a zone, the next zones are renumbered"""
         if name == '':
             return
-        config = await self.get_config()
-        zone_id = ''
-        config.zones.items()
-        for [key, zone] in config.zones.items():
-            if zone.name == name:
-                zone_id = key
-        config.zones.pop(zone_id)
-        await self.__save_data(config)
-        self.data = None
+        async with self.transaction() as config:
+            for zone_id, zone in list(config.zones.items()):
+                if zone.name == name:
+                    config.zones.pop(zone_id)
 
     async def __is_zone_exist(self, zone_id: str) -> bool:
         """Return True if the zone exists in the config file"""
@@ -169,12 +255,26 @@ class Config(LocalStorage):
             raise ZoneNotFoundError(zone_id)
         return (await self.get_config()).zones[zone_id]
 
+    def get_encoded(self, key: str, build: Callable[[], Any]) -> str:
+        """Return the json of build(), encoded once per revision and cached under key"""
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = self._encoded[key] = dumps(build())
+        return encoded
+
+    def get_schedule_index(self, zone_id: str) -> ScheduleIndex:
+        """Return the compiled schedule index of the zone, reloaded in place on each commit"""
+        if zone_id not in self._indexes:
+            if self.data is None or zone_id not in self.data.zones:
+                raise ZoneNotFoundError(zone_id)
+            self._indexes[zone_id] = ScheduleIndex(self.data.zones[zone_id].prog)
+        return self._indexes[zone_id]
+
     def get_ws_url(self):
         """return the url of ws server"""
         return self.data.ws_url if self.data and hasattr(self.data, 'ws_url') else None
 
     async def set_ws_url(self, ip):
         """set the url of ws server"""
-        config = self.data
-        config.ws_url = F'http://{ip}'
-        await self.__save_data(config)
+        async with self.transaction() as config:
+            config.ws_url = F'http://{ip}'
@@ -0,0 +1,28 @@
+"""ConfigStore class"""
+from homeassistant.helpers.storage import Store
+
+from custom_components.heatger.shared.logs.logs import Logs
+from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
+
+CLASSNAME = 'ConfigStore'
+
+
+class ConfigStore(Store):
+    """Store of the config file, migrates the files written by an older version on load"""
+
+    async def _async_migrate_func(self, old_major_version: int, old_minor_version: int, old_data: dict) -> dict:
+        if old_major_version < 2:
+            old_data = migrate_packed_prog(old_data)
+        Logs.info(CLASSNAME, F'Config migrated from version {old_major_version} to {self.version}')
+        return old_data
+
+
+def migrate_packed_prog(data: dict) -> dict:
+    """version 1 to 2, return a copy of data with the schedule objects of each zone replaced by packed ints"""
+    if not data:
+        return data
+    zones = {zone_id: {**zone, 'prog': [schedule if isinstance(schedule, int)
+                                        else ScheduleDto.from_dict(schedule).to_packed()
+                                        for schedule in zone.get('prog', [])]}
+             for zone_id, zone in data.get('zones', {}).items()}
+    return {**data, 'zones': zones}
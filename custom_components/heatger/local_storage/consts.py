@@ -1,2 +1,6 @@
 """Const for LocalStorage class"""
 CLASSNAME = "LocalStorage"
+# delay in seconds used to coalesce persistence writes
+PERSISTENCE_SAVE_DELAY = 1
+# version of the config file, 2 stores the schedules packed in ints
+CONFIG_STORE_VERSION = 2
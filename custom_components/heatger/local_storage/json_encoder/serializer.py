@@ -0,0 +1,104 @@
+"""Serializer functions, fast path for the known objects"""
+import datetime
+import json
+from functools import lru_cache
+from typing import Any, Callable
+
+from custom_components.heatger.local_storage.config.dto.config_dto import ConfigDto
+from custom_components.heatger.local_storage.persistence.dto.persistence_dto import PersistenceDto
+from custom_components.heatger.shared.enum.mode import Mode
+from custom_components.heatger.shared.enum.state import State
+from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
+from custom_components.heatger.zone.dto.zone_dto import ZoneDto
+from custom_components.heatger.zone.dto.zone_persistence_dto import ZonePersistenceDto
+from custom_components.heatger.zone.schedule_list import ScheduleList
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# enum members are immutable, their json value is computed once
+_ENUM_VALUES = {member: member.value for enum in (State, Mode) for member in enum}
+
+
+@lru_cache(maxsize=2048)
+def _time_to_primitive(value: datetime.time) -> str:
+    """return the iso format of a time, times are immutable so the result is cached"""
+    return value.isoformat()
+
+
+def _schedule_to_primitive(schedule: ScheduleDto) -> dict:
+    return {'day': schedule.day,
+            'hour': _time_to_primitive(schedule.hour),
+            'state': _ENUM_VALUES[schedule.state]}
+
+
+def _schedule_list_to_primitive(prog: ScheduleList) -> list:
+    return [_schedule_to_primitive(schedule) for schedule in prog]
+
+
+def _zone_to_primitive(zone: ZoneDto) -> dict:
+    return {'name': zone.name,
+            'enabled': zone.enabled,
+            'prog': _schedule_list_to_primitive(zone.prog)}
+
+
+def _config_to_primitive(config: ConfigDto) -> dict:
+    return {'zones': {zone_id: _zone_to_primitive(zone) for zone_id, zone in config.zones.items()},
+            'users': list(config.users),
+            'ws_url': config.ws_url}
+
+
+def config_to_storage(config: ConfigDto) -> dict:
+    """return the config in the storage format, the schedules are packed in ints"""
+    return {'zones': {zone_id: {'name': zone.name,
+                                'enabled': zone.enabled,
+                                'prog': zone.prog.packed.tolist()}
+                      for zone_id, zone in config.zones.items()},
+            'users': list(config.users),
+            'ws_url': config.ws_url}
+
+
+def _zone_persistence_to_primitive(zone: ZonePersistenceDto) -> dict:
+    return {'zone_id': zone.zone_id,
+            'state': _ENUM_VALUES[zone.state],
+            'mode': _ENUM_VALUES[zone.mode]}
+
+
+def _persistence_to_primitive(persistence: PersistenceDto) -> dict:
+    return {'frost_free': persistence.frost_free,
+            'zones': [_zone_persistence_to_primitive(zone) for zone in persistence.zones]}
+
+
+_CONVERTERS: dict[type, Callable[[Any], Any]] = {
+    State: _ENUM_VALUES.__getitem__,
+    Mode: _ENUM_VALUES.__getitem__,
+    datetime.time: _time_to_primitive,
+    datetime.datetime: datetime.datetime.isoformat,
+    ScheduleDto: _schedule_to_primitive,
+    ScheduleList: _schedule_list_to_primitive,
+    ZoneDto: _zone_to_primitive,
+    ConfigDto: _config_to_primitive,
+    ZonePersistenceDto: _zone_persistence_to_primitive,
+    PersistenceDto: _persistence_to_primitive,
+}
+
+
+def to_primitive(obj: Any) -> Any:
+    """convert DTOs, enums and dates to json primitives, dispatch is done on the exact type"""
+    converter = _CONVERTERS.get(type(obj))
+    if converter is not None:
+        return converter(obj)
+    if isinstance(obj, dict):
+        return {key: to_primitive(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_primitive(value) for value in obj]
+    return obj
+
+
+def dumps(obj: Any) -> str:
+    """return the json string of obj, orjson is used when installed"""
+    if orjson is not None:
+        return orjson.dumps(to_primitive(obj)).decode()
+    return json.dumps(to_primitive(obj), separators=(',', ':'))
@@ -1,18 +1,48 @@
 """LocalStorage class"""
+import time
+from typing import Any, Callable, Optional
+
 from homeassistant.helpers.storage import Store
 
+from custom_components.heatger.local_storage.json_encoder.serializer import to_primitive
+from custom_components.heatger.shared.metrics.metrics import Metrics
+
+STORE_READS = Metrics().counter('heatger_store_reads_total', 'Store reads', 'store')
+STORE_WRITES = Metrics().counter('heatger_store_writes_total', 'Store writes, delayed writes included', 'store')
+STORE_READ_SECONDS = Metrics().histogram('heatger_store_read_seconds', 'Store read latency', 'store')
+STORE_WRITE_SECONDS = Metrics().histogram('heatger_store_write_seconds', 'Store immediate write latency', 'store')
+
 
 class LocalStorage:
     """Read/write json in store"""
 
-    def __init__(self, hass, name: str):
+    def __init__(self, hass, name: str, version: int = 1, store_class: Optional[type[Store]] = None):
         # init store
-        self.store = Store(hass, 1, F'heatger-{name}')
+        self.name = name
+        self.store = (store_class or Store)(hass, version, F'heatger-{name}')
 
     async def _read(self):
         """get data from store"""
-        return await self.store.async_load()
+        start = time.monotonic()
+        data = await self.store.async_load()
+        STORE_READ_SECONDS.observe(time.monotonic() - start, self.name)
+        STORE_READS.inc(label=self.name)
+        return data
 
     async def _write(self, data):
         """store latest data for recovery"""
-        await self.store.async_save(data)
+        start = time.monotonic()
+        await self.store.async_save(self._to_storage(data))
+        STORE_WRITE_SECONDS.observe(time.monotonic() - start, self.name)
+        STORE_WRITES.inc(label=self.name)
+
+    def _delay_write(self, data_func: Callable[[], Any], delay: float):
+        """store the data returned by data_func after delay seconds, successive calls are coalesced"""
+        def data_to_save():
+            STORE_WRITES.inc(label=self.name)
+            return self._to_storage(data_func())
+        self.store.async_delay_save(data_to_save, delay)
+
+    def _to_storage(self, data) -> Any:
+        """return data in the format written in the store"""
+        return to_primitive(data)
@@ -2,6 +2,7 @@
 from datetime import datetime
 from typing import Optional
 
+from custom_components.heatger.local_storage.consts import PERSISTENCE_SAVE_DELAY
 from custom_components.heatger.local_storage.persistence.dto.persistence_dto import PersistenceDto
 from custom_components.heatger.local_storage.local_storage import LocalStorage
 from custom_components.heatger.shared.enum.mode import Mode
@@ -24,6 +25,8 @@ class Persistence(LocalStorage):
             return
         super().__init__(hass, 'persist')
         self.persist: Optional[PersistenceDto] = None
+        self._zones: dict[str, ZonePersistenceDto] = {}
+        self._dirty: set[str] = set()
         Persistence._initialized = True
 
     async def init_data(self):
@@ -34,11 +37,22 @@ class Persistence(LocalStorage):
         except TypeError:
             self.persist = PersistenceDto([], '')
             await self.__save_in_file()
+        self._zones = {zone.zone_id: zone for zone in self.persist.zones}
         return self.persist
 
     async def __save_in_file(self):
         """Save persistence object to file"""
-        await self._write(self.persist)
+        await self._write(self.__data_to_save())
+
+    def __data_to_save(self) -> PersistenceDto:
+        """return the persistence object to store, pending changes are considered flushed"""
+        self._dirty.clear()
+        return self.persist
+
+    async def async_flush(self) -> None:
+        """write pending changes now instead of waiting the end of the delay"""
+        if self._dirty:
+            await self.__save_in_file()
 
     def get_state(self, zone_id: str) -> State:
         """get order in file"""
@@ -49,7 +63,7 @@ class Persistence(LocalStorage):
         """write order in file"""
         zone = self.__get_zone(zone_id)
         zone.state = state
-        await self.__set_zone(zone)
+        self.__set_zone(zone)
 
     def get_mode(self, zone_id: str) -> Mode:
         """get mode in file"""
@@ -60,24 +74,37 @@ class Persistence(LocalStorage):
         """write mode in file"""
         zone = self.__get_zone(zone_id)
         zone.mode = mode
-        await self.__set_zone(zone)
+        self.__set_zone(zone)
+
+    async def set_zones(self, zones: dict[str, tuple[Optional[State], Mode]]):
+        """write state and mode of several zones with a single delayed write, a None state is kept"""
+        for zone_id, (state, mode) in zones.items():
+            zone = self.__get_zone(zone_id)
+            if state is not None:
+                zone.state = state
+            zone.mode = mode
+            self.__add_zone(zone)
+        if zones:
+            self._delay_write(self.__data_to_save, PERSISTENCE_SAVE_DELAY)
 
     def __get_zone(self, zone_id: str) -> ZonePersistenceDto:
         """return the zone matching with id or a new zone if not exist"""
-        for zone in self.persist.zones:
-            if zone.zone_id == zone_id:
-                return zone
-        return ZonePersistenceDto(zone_id, State.ECO, Mode.AUTO)
-
-    async def __set_zone(self, zone_dto: ZonePersistenceDto) -> None:
-        """update the zone with the given zone_dto object"""
-        zones_list = []
-        for zone in self.persist.zones:
-            if zone != zone_dto:
-                zones_list.append(zone)
-        zones_list.append(zone_dto)
-        self.persist.zones = zones_list
-        await self.__save_in_file()
+        zone = self._zones.get(zone_id)
+        if zone is None:
+            return ZonePersistenceDto(zone_id, State.ECO, Mode.AUTO)
+        return zone
+
+    def __set_zone(self, zone_dto: ZonePersistenceDto) -> None:
+        """update the zone with the given zone_dto object and schedule a delayed write"""
+        self.__add_zone(zone_dto)
+        self._delay_write(self.__data_to_save, PERSISTENCE_SAVE_DELAY)
+
+    def __add_zone(self, zone_dto: ZonePersistenceDto) -> None:
+        """register the zone if new and mark it as pending"""
+        if zone_dto.zone_id not in self._zones:
+            self._zones[zone_dto.zone_id] = zone_dto
+            self.persist.zones.append(zone_dto)
+        self._dirty.add(zone_dto.zone_id)
 
     async def set_frost_free_end_date(self, end_date: datetime = None) -> None:
         """update the frost-free end date"""
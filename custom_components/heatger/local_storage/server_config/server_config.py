@@ -0,0 +1,43 @@
+"""ServerConfig class"""
+from typing import Optional
+
+from custom_components.heatger.local_storage.local_storage import LocalStorage
+
+
+class ServerConfig(LocalStorage):
+    """Cache of the last config received from the heatger server,
+    the sensors are registered from it without waiting the server"""
+    _initialized = False
+    _instance: Optional['ServerConfig'] = None
+
+    def __new__(cls, *args, **kwargs) -> 'ServerConfig':
+        if not isinstance(cls._instance, cls):
+            cls._instance = super(ServerConfig, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, hass):
+        if ServerConfig._initialized:
+            return
+        super().__init__(hass, 'server')
+        self.data: Optional[dict] = None
+        self._loaded = False
+        ServerConfig._initialized = True
+
+    async def get_config(self) -> Optional[dict]:
+        """return the cached server config, None if the server never sent it"""
+        if not self._loaded:
+            data = await self._read()
+            # a config set during the read is newer than the file
+            if not self._loaded:
+                self.data = data or None
+                self._loaded = True
+        return self.data
+
+    async def set_config(self, config: dict) -> bool:
+        """cache the config sent by the server, return True if it changed"""
+        if not config or config == await self.get_config():
+            return False
+        self.data = config
+        self._loaded = True
+        await self._write(config)
+        return True
@@ -1,113 +1,203 @@
 """sensor class"""
+import time
+from typing import Any, Callable, Optional
+
 from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.const import UnitOfEnergy, UnitOfTemperature, UnitOfPressure, \
     PERCENTAGE
 
 from custom_components.heatger import DOMAIN, WSClient
+from custom_components.heatger.const import DEADBAND, MIN_INTERVAL, DEFAULT_DEADBANDS, DEFAULT_MIN_INTERVAL
 from custom_components.heatger.coordinator import SensorCoordinator
+from custom_components.heatger.local_storage.server_config.server_config import ServerConfig
+from custom_components.heatger.shared.logs.logs import Logs
+from custom_components.heatger.shared.metrics.metrics import Metrics
+
+CLASSNAME = 'Sensor'
+TEMPERATURE = 'temperature'
+ELECTRIC_METER = 'electric_meter'
+SENSOR_WRITES = Metrics().counter('heatger_sensor_writes_total', 'States written by the telemetry sensors', 'sensor')
+SENSOR_SUPPRESSED = Metrics().counter('heatger_sensor_suppressed_total',
+                                      'Telemetry values not written, in the deadband or the min interval', 'sensor')
 
 
 async def async_setup_entry(hass, config, async_add_entities):
-    """Initialize and register sensors"""
+    """Initialize and register sensors from the cached server config, reconciled when the server sends it"""
     ws: WSClient = hass.data[DOMAIN]['WS']
-    server_config = await ws.get_config()
 
     temp_coordinator = SensorCoordinator(hass)
     em_coordinator = SensorCoordinator(hass)
     hass.data[DOMAIN]['temp_coordinator'] = temp_coordinator
     hass.data[DOMAIN]['em_coordinator'] = em_coordinator
 
-    # register sensors
-    if server_config['i2c']['temperature']['enabled']:
-        async_add_entities([
-            TemperatureEntity(temp_coordinator),
-            HumidityEntity(temp_coordinator),
-            PressureEntity(temp_coordinator),
-        ])
-    if server_config['entry']['electric_meter']['enabled']:
-        async_add_entities([
-            ElectricMeterEntity(em_coordinator)
-        ])
-
+    builders: dict[str, Callable[[], list[Entity]]] = {
+        TEMPERATURE: lambda: [
+            TemperatureEntity(temp_coordinator, config),
+            HumidityEntity(temp_coordinator, config),
+            PressureEntity(temp_coordinator, config),
+        ],
+        ELECTRIC_METER: lambda: [ElectricMeterEntity(em_coordinator, config)],
+    }
+    registered: dict[str, list[Entity]] = {}
+
+    async def reconcile(server_config: Optional[dict]) -> None:
+        """register the sensors enabled on the server, remove the disabled ones"""
+        capabilities = server_capabilities(server_config)
+        for capability in capabilities - registered.keys():
+            registered[capability] = builders[capability]()
+            async_add_entities(registered[capability])
+        for capability in registered.keys() - capabilities:
+            for entity in registered.pop(capability):
+                await entity.async_remove()
+        Logs.info(CLASSNAME, F'Sensors enabled: {sorted(registered)}')
+
+    config.async_on_unload(ws.add_config_listener(reconcile))
+    cached_config = await ServerConfig(hass).get_config()
+    # read after the cache, a live config received meanwhile wins over the cached one
+    await reconcile(ws.config or cached_config)
     return True
 
 
-class BaseEntity(CoordinatorEntity, Entity):
-    def __init__(self, name: str, coordinator: SensorCoordinator):
-        """temperature sensor"""
-        super().__init__(coordinator=coordinator)
-        self.entity_id = f'sensor.heatger_{name}'
-        self._attr_unique_id = f'heatger_{name}'
+def server_capabilities(server_config: Optional[dict]) -> set[str]:
+    """return the sensors enabled in the server config"""
+    if not server_config:
+        return set()
+    capabilities = set()
+    if server_config.get('i2c', {}).get('temperature', {}).get('enabled'):
+        capabilities.add(TEMPERATURE)
+    if server_config.get('entry', {}).get('electric_meter', {}).get('enabled'):
+        capabilities.add(ELECTRIC_METER)
+    return capabilities
+
+
+class TelemetryEntity(CoordinatorEntity):
+    """Sensor written only when its value moved more than the deadband, at most once per min interval"""
+
+    def __init__(self, name: str, coordinator: SensorCoordinator, entry: ConfigEntry):
+        super().__init__(coordinator)
         self._name = name
+        self._entry = entry
         self._state = None
+        self._written_state = None
+        self._written_at: Optional[float] = None
+        self._cancel_write: Optional[Callable[[], None]] = None
 
     @property
-    def state(self):
-        """return the actual state of the sensor"""
-        return self._state
+    def deadband(self) -> float:
+        """minimal change of the value to write the state"""
+        return self._entry.options.get(F'{self._name}_{DEADBAND}', DEFAULT_DEADBANDS[self._name])
+
+    @property
+    def min_interval(self) -> float:
+        """minimal time in seconds between two writes of the state"""
+        return self._entry.options.get(MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the value of this sensor only"""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_add_key_listener(self._name, self._handle_value))
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the pending write"""
+        if self._cancel_write:
+            self._cancel_write()
+            self._cancel_write = None
+        await super().async_will_remove_from_hass()
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        data = self.coordinator.data
-        if not data:
+    def _handle_value(self, value: Any) -> None:
+        """Handle a new value of the sensor"""
+        self._state = value
+        if self._cancel_write or self._in_deadband(value):
+            SENSOR_SUPPRESSED.inc(label=self._name)
             return
-        self._state = data[self._name]
+        elapsed = time.monotonic() - self._written_at if self._written_at is not None else None
+        if elapsed is not None and elapsed < self.min_interval:
+            SENSOR_SUPPRESSED.inc(label=self._name)
+            self._cancel_write = async_call_later(self.hass, self.min_interval - elapsed, self._delayed_write)
+            return
+        self._write_state()
+
+    def _in_deadband(self, value: Any) -> bool:
+        """return True if the value is too close to the last written value"""
+        if self._written_state is None or value is None:
+            return False
+        try:
+            return abs(value - self._written_state) < self.deadband
+        except TypeError:
+            return value == self._written_state
+
+    @callback
+    def _delayed_write(self, _now) -> None:
+        """Write the last value received during the min interval"""
+        self._cancel_write = None
+        if self._state != self._written_state and not self._in_deadband(self._state):
+            self._write_state()
+
+    @callback
+    def _write_state(self) -> None:
+        self._written_state = self._state
+        self._written_at = time.monotonic()
+        SENSOR_WRITES.inc(label=self._name)
         self.async_write_ha_state()
 
 
+class BaseEntity(TelemetryEntity, Entity):
+    def __init__(self, name: str, coordinator: SensorCoordinator, entry: ConfigEntry):
+        """temperature sensor"""
+        super().__init__(name, coordinator, entry)
+        self.entity_id = f'sensor.heatger_{name}'
+        self._attr_unique_id = f'heatger_{name}'
+
+    @property
+    def state(self):
+        """return the actual state of the sensor"""
+        return self._state
+
+
 class TemperatureEntity(BaseEntity):
     device_class = SensorDeviceClass.TEMPERATURE
     unit_of_measurement = UnitOfTemperature.CELSIUS
 
-    def __init__(self, coordinator: SensorCoordinator):
+    def __init__(self, coordinator: SensorCoordinator, entry: ConfigEntry):
         """temperature sensor"""
-        super().__init__('temperature', coordinator)
+        super().__init__('temperature', coordinator, entry)
 
 
 class HumidityEntity(BaseEntity):
     device_class = SensorDeviceClass.HUMIDITY
     unit_of_measurement = PERCENTAGE
 
-    def __init__(self, coordinator: SensorCoordinator):
+    def __init__(self, coordinator: SensorCoordinator, entry: ConfigEntry):
         """Humidity sensor"""
-        super().__init__('humidity', coordinator)
+        super().__init__('humidity', coordinator, entry)
 
 
 class PressureEntity(BaseEntity):
     device_class = SensorDeviceClass.PRESSURE
     unit_of_measurement = UnitOfPressure.HPA
 
-    def __init__(self, coordinator: SensorCoordinator):
+    def __init__(self, coordinator: SensorCoordinator, entry: ConfigEntry):
         """Pressure sensor"""
-        super().__init__('pressure', coordinator)
+        super().__init__('pressure', coordinator, entry)
 
 
-class ElectricMeterEntity(CoordinatorEntity, SensorEntity):
-    def __init__(self, coordinator: SensorCoordinator):
+class ElectricMeterEntity(TelemetryEntity, SensorEntity):
+    def __init__(self, coordinator: SensorCoordinator, entry: ConfigEntry):
         """electric meter sensor"""
-        super().__init__(coordinator)
+        super().__init__('electric_meter', coordinator, entry)
         self.entity_id = 'sensor.heatger_electric_meter'
         self._attr_unique_id = 'heatger_electric_meter'
-        self._name = 'electric_meter'
         self._attr_device_class = SensorDeviceClass.ENERGY
         self._attr_native_unit_of_measurement = UnitOfEnergy.WATT_HOUR
         self._attr_state_class = 'total_increasing'
-        self._state = None
 
     @property
     def native_value(self):
         """return the actual state of the sensor"""
         return self._state
-
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        data = self.coordinator.data
-        if not data:
-            return
-        self._state = data[self._name]
-        self.async_write_ha_state()
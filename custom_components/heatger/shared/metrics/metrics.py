@@ -0,0 +1,145 @@
+"""Metrics registry"""
+from bisect import bisect_left
+from typing import Callable, Optional, Union
+
+# seconds, from a fast local call to a slow network round trip
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+
+class Counter:
+    """monotonic value, optionally split by the value of a label"""
+    kind = 'counter'
+
+    def __init__(self, name: str, description: str, label: Optional[str] = None):
+        self.name = name
+        self.description = description
+        self.label = label
+        self.values: dict[Optional[str], float] = {}
+
+    def inc(self, amount: float = 1, label: Optional[str] = None) -> None:
+        """add amount to the value of label"""
+        self.values[label] = self.values.get(label, 0) + amount
+
+    def to_object(self) -> Union[float, dict]:
+        if self.label is None:
+            return self.values.get(None, 0)
+        return dict(self.values)
+
+    def lines(self) -> list[str]:
+        if not self.values:
+            return [F'{self.name} 0'] if self.label is None else []
+        return [F'{self.name}{_labels(self.label, label)} {_number(value)}' for label, value in self.values.items()]
+
+
+class Gauge:
+    """value read on export with a callback"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, description: str, read: Callable[[], float]):
+        self.name = name
+        self.description = description
+        self.read = read
+
+    def to_object(self) -> float:
+        return self.read()
+
+    def lines(self) -> list[str]:
+        return [F'{self.name} {_number(self.read())}']
+
+
+class Histogram:
+    """distribution of observed values in fixed buckets, optionally split by the value of a label"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, description: str, label: Optional[str] = None,
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label = label
+        self.buckets = buckets
+        # label -> [counts per bucket + one for +Inf, sum]
+        self.values: dict[Optional[str], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, label: Optional[str] = None) -> None:
+        """add a value to the distribution of label"""
+        entry = self.values.get(label)
+        if entry is None:
+            entry = self.values[label] = ([0] * (len(self.buckets) + 1), [0.0])
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    def to_object(self) -> dict:
+        result = {}
+        for label, (counts, total) in self.values.items():
+            count = sum(counts)
+            result[label if label is not None else 'all'] = {
+                'count': count, 'sum': round(total[0], 6), 'mean': round(total[0] / count, 6) if count else 0}
+        return result
+
+    def lines(self) -> list[str]:
+        lines = []
+        for label, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(F'{self.name}_bucket{_labels(self.label, label, le=bound)} {cumulative}')
+            lines.append(F'{self.name}_sum{_labels(self.label, label)} {_number(total[0])}')
+            lines.append(F'{self.name}_count{_labels(self.label, label)} {cumulative}')
+        return lines
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class Metrics:
+    """Registry of the integration metrics, exported in the Prometheus text format"""
+    _instance: Optional['Metrics'] = None
+
+    def __new__(cls, *args, **kwargs) -> 'Metrics':
+        if not isinstance(cls._instance, cls):
+            cls._instance = super(Metrics, cls).__new__(cls)
+            cls._instance.metrics = {}
+        return cls._instance
+
+    def counter(self, name: str, description: str, label: Optional[str] = None) -> Counter:
+        """return the counter registered with name, created if needed"""
+        return self.__register(Counter(name, description, label))
+
+    def gauge(self, name: str, description: str, read: Callable[[], float]) -> Gauge:
+        """register a gauge read with the read callback"""
+        return self.__register(Gauge(name, description, read))
+
+    def histogram(self, name: str, description: str, label: Optional[str] = None,
+                  buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        """return the histogram registered with name, created if needed"""
+        return self.__register(Histogram(name, description, label, buckets))
+
+    def __register(self, metric: Metric):
+        self.metrics.setdefault(metric.name, metric)
+        return self.metrics[metric.name]
+
+    def to_object(self) -> dict:
+        """return every metric as a json object"""
+        return {name: metric.to_object() for name, metric in self.metrics.items()}
+
+    def to_text(self) -> str:
+        """return every metric in the Prometheus text format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(F'# HELP {metric.name} {metric.description}')
+            lines.append(F'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.lines())
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(name: Optional[str], value: Optional[str], **extra) -> str:
+    """return the label set of a sample, empty if there is no label"""
+    labels = [F'{key}="{_number(label) if isinstance(label, float) else label}"' for key, label in extra.items()]
+    if name is not None and value is not None:
+        labels.insert(0, F'{name}="{value}"')
+    return '{' + ','.join(labels) + '}' if labels else ''
+
+
+def _number(value: float) -> str:
+    """return the text of a sample value, integers without decimals"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,211 @@
+"""Scheduler class"""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Callable, Coroutine, Optional
+
+from custom_components.heatger.shared.logs.logs import Logs
+from custom_components.heatger.shared.metrics.metrics import Metrics
+
+CLASSNAME = 'Scheduler'
+# compact the heap when more than half of it is made of cancelled entries
+COMPACT_MIN_SIZE = 64
+# seconds between two comparisons of the wall clock with the loop clock
+DRIFT_CHECK_INTERVAL = 60
+# divergence in seconds above which the deadlines are moved back to their wall clock target
+DRIFT_TOLERANCE = 1
+TIMER_LATENESS_SECONDS = Metrics().histogram('heatger_timer_lateness_seconds',
+                                             'Delay between the wall clock target of a timer and its callback')
+
+
+class ScheduledEntry:
+    """a deadline owned by the scheduler, target is the wall clock time and deadline its loop time"""
+    __slots__ = ('target', 'deadline', 'sequence', 'callback', 'active')
+
+    def __init__(self, target: float, deadline: float, sequence: int, callback: Callable[[], Coroutine]):
+        self.target = target
+        self.deadline = deadline
+        self.sequence = sequence
+        self.callback = callback
+        self.active = True
+
+    def __lt__(self, other: 'ScheduledEntry') -> bool:
+        return (self.deadline, self.sequence) < (other.deadline, other.sequence)
+
+
+class Scheduler:
+    """Own every deadline of the integration and drive them with a single loop.call_at handle.
+    Deadlines follow the monotonic loop clock, a periodic check moves them back to their wall clock
+    target when both clocks diverge (host suspend, NTP step), overdue entries then fire at once"""
+    _instance: Optional['Scheduler'] = None
+
+    def __new__(cls, *args, **kwargs) -> 'Scheduler':
+        if not isinstance(cls._instance, cls):
+            cls._instance = super(Scheduler, cls).__new__(cls)
+            cls._instance._setup()
+        return cls._instance
+
+    def _setup(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._heap: list[ScheduledEntry] = []
+        self._cancelled = 0
+        self._sequence = itertools.count()
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._handle_deadline: Optional[float] = None
+        self._drift_handle: Optional[asyncio.TimerHandle] = None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """return the running loop, dropping the deadlines bound to a previous loop"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self.stop()
+            self._setup()
+            self._loop = loop
+        return loop
+
+    def schedule(self, delay: float, callback: Callable[[], Coroutine]) -> ScheduledEntry:
+        """call callback after delay seconds, return the entry used to cancel it"""
+        loop = self._get_loop()
+        delay = max(delay, 0)
+        entry = ScheduledEntry(time.time() + delay, loop.time() + delay, next(self._sequence), callback)
+        heapq.heappush(self._heap, entry)
+        self._arm()
+        return entry
+
+    def schedule_many(self, items: list[tuple[float, Callable[[], Coroutine]]]) -> list[ScheduledEntry]:
+        """schedule several callbacks, the heap is rebuilt once instead of one push per entry"""
+        loop = self._get_loop()
+        now = loop.time()
+        wall_now = time.time()
+        entries = [ScheduledEntry(wall_now + max(delay, 0), now + max(delay, 0), next(self._sequence), callback)
+                   for delay, callback in items]
+        self._heap.extend(entries)
+        heapq.heapify(self._heap)
+        self._arm()
+        return entries
+
+    def reschedule(self, entry: Optional[ScheduledEntry], delay: float,
+                   callback: Callable[[], Coroutine]) -> ScheduledEntry:
+        """cancel entry if still pending and schedule callback after delay seconds"""
+        self.cancel(entry)
+        return self.schedule(delay, callback)
+
+    def cancel(self, entry: Optional[ScheduledEntry]) -> None:
+        """cancel a pending entry, the heap slot is released lazily"""
+        if entry is None or not entry.active:
+            return
+        entry.active = False
+        self._cancelled += 1
+        if self._cancelled > COMPACT_MIN_SIZE and self._cancelled * 2 > len(self._heap):
+            self._heap = [item for item in self._heap if item.active]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+        self._arm()
+
+    def cancel_many(self, entries: list[Optional[ScheduledEntry]]) -> None:
+        """cancel several entries, the heap is compacted at most once"""
+        for entry in entries:
+            if entry is not None and entry.active:
+                entry.active = False
+                self._cancelled += 1
+        if self._cancelled > COMPACT_MIN_SIZE and self._cancelled * 2 > len(self._heap):
+            self._heap = [item for item in self._heap if item.active]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+        self._arm()
+
+    def stop(self) -> None:
+        """cancel every pending entry and the loop handles, on unload"""
+        for entry in self._heap:
+            entry.active = False
+        self._cancel_handles()
+        self._heap.clear()
+        self._cancelled = 0
+
+    def remaining(self, entry: Optional[ScheduledEntry]) -> float:
+        """return the remaining seconds before the entry fires, -1 if not pending"""
+        if entry is None or not entry.active or self._loop is None:
+            return -1
+        return max(entry.deadline - self._loop.time(), 0)
+
+    def active_count(self) -> int:
+        """return the number of pending deadlines"""
+        return len(self._heap) - self._cancelled
+
+    def _pop_inactive(self) -> None:
+        """drop the cancelled entries at the top of the heap"""
+        while self._heap and not self._heap[0].active:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+
+    def _arm(self) -> None:
+        """point the single loop handle at the earliest pending deadline"""
+        self._pop_inactive()
+        if not self._heap:
+            # no handle must outlive the last deadline
+            self._cancel_handles()
+            return
+        if self._drift_handle is None:
+            self._drift_handle = self._loop.call_later(DRIFT_CHECK_INTERVAL, self._check_drift)
+        deadline = self._heap[0].deadline
+        if self._handle is not None and self._handle_deadline <= deadline:
+            return
+        if self._handle is not None:
+            self._handle.cancel()
+        self._handle = self._loop.call_at(deadline, self._on_handle)
+        self._handle_deadline = deadline
+
+    def _cancel_handles(self) -> None:
+        """cancel the deadline and drift check handles"""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+            self._handle_deadline = None
+        if self._drift_handle is not None:
+            self._drift_handle.cancel()
+            self._drift_handle = None
+
+    def _on_handle(self) -> None:
+        """fire every due entry then re-arm on the next one"""
+        self._handle = None
+        self._handle_deadline = None
+        now = self._loop.time()
+        while self._heap and self._heap[0].deadline <= now:
+            entry = heapq.heappop(self._heap)
+            if not entry.active:
+                self._cancelled -= 1
+                continue
+            entry.active = False
+            TIMER_LATENESS_SECONDS.observe(max(time.time() - entry.target, 0))
+            self._loop.create_task(self._run(entry.callback))
+        self._arm()
+
+    def _check_drift(self) -> None:
+        """move the deadlines diverging from their wall clock target and re-arm the loop handle"""
+        self._drift_handle = None
+        offset = time.time() - self._loop.time()
+        moved = 0
+        for entry in self._heap:
+            deadline = entry.target - offset
+            if entry.active and abs(deadline - entry.deadline) > DRIFT_TOLERANCE:
+                entry.deadline = deadline
+                moved += 1
+        if moved:
+            Logs.info(CLASSNAME, F'clock drift detected, {moved} timers re-armed')
+            heapq.heapify(self._heap)
+            if self._handle is not None:
+                self._handle.cancel()
+                self._handle = None
+        self._arm()
+
+    @staticmethod
+    async def _run(callback: Callable[[], Coroutine]) -> None:
+        """run a timeout callback, an error must not break the other deadlines"""
+        try:
+            await callback()
+        except Exception as e:  # pylint: disable=broad-except
+            Logs.error(CLASSNAME, e)
+
+
+Metrics().gauge('heatger_active_timers', 'Pending timers', lambda: Scheduler().active_count())
@@ -1,42 +1,44 @@
 """Timer class"""
-import asyncio
-from datetime import datetime
+from typing import Callable, Coroutine, Optional
+
+from custom_components.heatger.shared.timer.scheduler import Scheduler, ScheduledEntry
 
 
 class Timer:
-    """Provide a timer"""
+    """Provide a timer, backed by the shared scheduler"""
     def __init__(self):
-        self.time_start = None
-        self.timeout = None
-        self.timer_task = None
+        self.entry: Optional[ScheduledEntry] = None
 
     async def start(self, timeout, on_timeout_callback):
         """start timer with timeout in seconds, on timeout call on_timeout_callback"""
-        await self.stop()
-        self.time_start = datetime.now().timestamp()
-        self.timeout = timeout
-
-        async def timer():
-            await asyncio.sleep(self.timeout)
-            await on_timeout_callback()
-
-        self.timer_task = asyncio.create_task(timer())
+        self.entry = Scheduler().reschedule(self.entry, timeout, on_timeout_callback)
 
     async def stop(self):
         """stop timer"""
-        if self.timer_task is None:
-            return
-        self.timer_task.cancel()
-        try:
-            await self.timer_task
-        except asyncio.CancelledError:
-            pass
-        self.timer_task = None
-        self.time_start = None
-        self.timeout = None
+        Scheduler().cancel(self.entry)
+        self.entry = None
+
+    @staticmethod
+    async def start_many(timers: list[tuple['Timer', float, Callable[[], Coroutine]]]):
+        """start several timers (timer, timeout, on_timeout_callback) in a single pass"""
+        Scheduler().cancel_many([timer.entry for timer, _, _ in timers])
+        entries = Scheduler().schedule_many([(timeout, callback) for _, timeout, callback in timers])
+        for (timer, _, _), entry in zip(timers, entries):
+            timer.entry = entry
+
+    @staticmethod
+    async def stop_many(timers: list['Timer']):
+        """stop several timers in a single pass"""
+        Scheduler().cancel_many([timer.entry for timer in timers])
+        for timer in timers:
+            timer.entry = None
 
     def get_remaining_time(self) -> int:
         """return the remaining time before timeout"""
-        if self.timeout is None or self.time_start is None:
-            return -1
-        return int(self.timeout - (datetime.now().timestamp() - self.time_start))
+        return int(Scheduler().remaining(self.entry))
+
+    def get_deadline(self) -> Optional[int]:
+        """return the loop time of the timeout, None if not started"""
+        if self.entry is None or not self.entry.active:
+            return None
+        return round(self.entry.deadline)
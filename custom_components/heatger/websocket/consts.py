@@ -0,0 +1,14 @@
+"""Const for websocket classes"""
+# max number of frames waiting to be sent, the oldest are dropped
+OUTBOUND_QUEUE_SIZE = 100
+# time in seconds used to merge the pending states in a single frame
+FLUSH_WINDOW = 0.05
+# max time in seconds to send a frame
+SEND_TIMEOUT = 5
+# reconnect delay in seconds, doubled on each failed attempt up to the max, with a random jitter
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 30
+# max time in seconds to wait the reply of a request
+REQUEST_TIMEOUT = 10
+# max number of received messages waiting to be handled, the oldest are dropped
+INBOUND_QUEUE_SIZE = 100
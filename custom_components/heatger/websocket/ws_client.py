@@ -1,27 +1,38 @@
 """WS client"""
 import asyncio
-import json
+import itertools
 import logging
+import random
 import socket
+from collections import deque
 from typing import Optional, Callable, Coroutine
 
 import aiohttp
 from aiohttp import ClientWebSocketResponse, WSMessage
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from custom_components.heatger.const import DOMAIN
 from custom_components.heatger.coordinator import SensorCoordinator
 from custom_components.heatger.local_storage.config.config import Config
-from custom_components.heatger.local_storage.json_encoder.json_encoder import JsonEncoder
+from custom_components.heatger.local_storage.server_config.server_config import ServerConfig
 from custom_components.heatger.shared.enum.state import State
+from custom_components.heatger.shared.metrics.metrics import Metrics
 from custom_components.heatger.shared.timer.timer import Timer
+from custom_components.heatger.websocket.consts import RECONNECT_MIN_DELAY, RECONNECT_MAX_DELAY, REQUEST_TIMEOUT
+from custom_components.heatger.websocket.ws_dispatcher import WSDispatcher
+from custom_components.heatger.websocket.ws_writer import WSWriter
 
 _LOGGER = logging.getLogger(__name__)
+WS_FRAMES_IN = Metrics().counter('heatger_ws_frames_in_total', 'Frames received from the server')
+WS_BYTES_IN = Metrics().counter('heatger_ws_bytes_in_total', 'Bytes received from the server')
+WS_RECONNECTS = Metrics().counter('heatger_ws_reconnects_total', 'Reconnect attempts to the server', 'result')
 
 
 class WSClient:
     """WebSocket Client: used to connect to the heatger server"""
     _ws: Optional[ClientWebSocketResponse] = None
+    _writer: Optional[WSWriter] = None
 
     def __init__(self, hass: HomeAssistant,
                  get_data_callback: Callable[[], Coroutine[any, None, int]] = None,
@@ -32,104 +43,219 @@ class WSClient:
         self.get_data = get_data_callback
         self.updated_data = updated_data_callback
         self.config = None
+        self.reconnect_timer = Timer()
+        self.reconnect_attempts = 0
+        self.failed_attempts = 0
+        self.closing = False
+        self._request_ids = itertools.count(1)
+        self._requests: dict[int, asyncio.Future] = {}
+        self._requests_by_type: dict[str, deque[int]] = {}
+        self._coordinators: dict[str, SensorCoordinator] = {}
+        self._config_listeners: list[Callable[[dict], Coroutine]] = []
+        self.dispatcher = WSDispatcher()
+        self.dispatcher.register('state', self._on_state)
+        self.dispatcher.register('electric_meter', self._on_electric_meter, latest_wins=True)
+        self.dispatcher.register('temperature', self._on_temperature, latest_wins=True)
+        self.dispatcher.register('config', self._on_config)
+
+    async def start(self):
+        """Connect to the server, or start the reconnect loop if the server is not reachable"""
+        self.closing = False
+        if not await self.connect():
+            await self._schedule_reconnect()
+            return
+        self.hass.async_create_task(self.refresh_config())
 
     async def connect(self):
-        """Connect to the server"""
-        client = aiohttp.ClientSession()
+        """Connect to the server, the session is shared with Home Assistant"""
+        session = async_get_clientsession(self.hass)
         try:
-            ws = await client.ws_connect(f'{self.server_url}/ws')
-            asyncio.create_task(self.events())
-            WSClient._ws = ws
-            return True
+            ws = await session.ws_connect(f'{self.server_url}/ws')
         except Exception as e:
             _LOGGER.error(e)
             self.connected = False
-            if WSClient._ws:
-                await WSClient._ws.close()
-                WSClient._ws = None
-            await client.close()
-        return False
+            return False
+        WSClient._ws = ws
+        WSClient._writer = WSWriter(ws)
+        WSClient._writer.start()
+        self.connected = True
+        self.failed_attempts = 0
+        self.dispatcher.start()
+        asyncio.create_task(self.events(ws))
+        return True
 
-    async def events(self):
+    async def events(self, ws: ClientWebSocketResponse):
         """run loop for waiting message from server"""
-        self.connected = True
         while self.connected:
-            msg: WSMessage = await WSClient._ws.receive()
-            if msg.type in (aiohttp.WSMsgType.CLOSED,
+            msg: WSMessage = await ws.receive()
+            if msg.type in (aiohttp.WSMsgType.CLOSE,
+                            aiohttp.WSMsgType.CLOSING,
+                            aiohttp.WSMsgType.CLOSED,
                             aiohttp.WSMsgType.ERROR):
                 self.connected = False
-                await WSClient._ws.close()
-                await self._auto_reconnect()
+                await WSClient._stop_writer()
+                await ws.close()
+                if not self.closing:
+                    await self._schedule_reconnect()
             else:
-                await self.eval_message(msg.data)
+                WS_FRAMES_IN.inc()
+                WS_BYTES_IN.inc(len(msg.data) if msg.data else 0)
+                self.dispatcher.feed(msg.data)
 
     async def eval_message(self, data: any):
-        """Evaluate the message from the server"""
-        try:
-            data = json.loads(data)
-            if 'state' in data:
-                for key, value in data.get('state').items():
-                    if self.updated_data:
-                        await self.updated_data(key, State(value))
-            elif 'electric_meter' in data:
-                try:
-                    coordinator: SensorCoordinator = self.hass.data[DOMAIN]['em_coordinator']
-                    coordinator.async_set_updated_data(data)
-                except KeyError:
-                    pass
-            elif 'temperature' in data:
-                try:
-                    coordinator: SensorCoordinator = self.hass.data[DOMAIN]['temp_coordinator']
-                    coordinator.async_set_updated_data(data.get('temperature'))
-                except KeyError:
-                    pass
-            elif 'config' in data:
-                self.config = data.get('config')
-
-        except TypeError:
-            pass
+        """Queue the message from the server for its handler, return immediately"""
+        self.dispatcher.feed(data)
+
+    async def _on_state(self, data: dict):
+        """handle the states sent by the server"""
+        if not self.updated_data:
+            return
+        for key, value in data.get('state').items():
+            await self.updated_data(key, State(value))
+
+    async def _on_electric_meter(self, data: dict):
+        """handle the electric meter telemetry"""
+        coordinator = self._get_coordinator('em_coordinator')
+        if coordinator:
+            coordinator.async_set_updated_values(data)
+
+    async def _on_temperature(self, data: dict):
+        """handle the temperature telemetry"""
+        coordinator = self._get_coordinator('temp_coordinator')
+        if coordinator:
+            coordinator.async_set_updated_values(data.get('temperature'))
+
+    async def _on_config(self, data: dict):
+        """handle the config sent by the server, cached and given to the listeners if it changed"""
+        config = data.get('config')
+        self._resolve_request('config', config, data.get('id'))
+        if not config:
+            return
+        self.config = config
+        if not await ServerConfig(self.hass).set_config(config):
+            return
+        for listener in list(self._config_listeners):
+            await listener(config)
+
+    def add_config_listener(self, listener: Callable[[dict], Coroutine]) -> Callable[[], None]:
+        """Call listener with the server config each time it changes, return a function to remove it"""
+        self._config_listeners.append(listener)
+        return lambda: self._config_listeners.remove(listener)
+
+    def _get_coordinator(self, name: str) -> Optional[SensorCoordinator]:
+        """return the coordinator registered by the sensor platform, resolved once"""
+        if name not in self._coordinators:
+            coordinator = self.hass.data.get(DOMAIN, {}).get(name)
+            if coordinator is None:
+                return None
+            self._coordinators[name] = coordinator
+        return self._coordinators[name]
 
     async def disconnect(self):
         """Disconnect from the server"""
-        async with asyncio.timeout(10):
-            await WSClient._ws.close()
-        self._ws = None
+        self.closing = True
+        await self.reconnect_timer.stop()
+        await WSClient._stop_writer()
+        await self.dispatcher.stop()
+        # no reply can come anymore, the pending requests are cancelled
+        for future in self._requests.values():
+            future.cancel()
+        self._requests.clear()
+        self._requests_by_type.clear()
+        if WSClient._ws:
+            async with asyncio.timeout(10):
+                await WSClient._ws.close()
+        WSClient._ws = None
         self.connected = False
 
-    async def get_config(self):
-        """return config from server"""
-        if self.config:
-            return self.config
+    async def refresh_config(self):
+        """ask the config to the server, the reply is handled by _on_config"""
+        try:
+            await self.request('config')
+        except TimeoutError:
+            _LOGGER.error('no config received from the server')
 
-        await self.send_data('config')
-        retry = 0
-        while not self.config and retry < 20:
-            await asyncio.sleep(0.5)
-            retry += 1
-        return self.config
+    async def request(self, message_type: str, timeout: float = REQUEST_TIMEOUT) -> any:
+        """send a request to the server and wait for the reply of the same type.
+        The request id is local, the server protocol has no id: a reply carrying an 'id' resolves
+        the matching request, otherwise the oldest pending request of this type"""
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._requests[request_id] = future
+        pending = self._requests_by_type.setdefault(message_type, deque())
+        pending.append(request_id)
+        try:
+            await self.send_data(message_type)
+            async with asyncio.timeout(timeout):
+                return await future
+        finally:
+            self._requests.pop(request_id, None)
+            if request_id in pending:
+                pending.remove(request_id)
+
+    def _resolve_request(self, message_type: str, result: any, request_id: Optional[int] = None) -> None:
+        """resolve the pending request matching the reply"""
+        pending = self._requests_by_type.get(message_type)
+        if request_id not in self._requests:
+            request_id = pending[0] if pending else None
+        future = self._requests.pop(request_id, None)
+        if pending and request_id in pending:
+            pending.remove(request_id)
+        if future and not future.done():
+            future.set_result(result)
 
+    async def _schedule_reconnect(self):
+        """arm the reconnect timer, the delay grows exponentially with the failed attempts"""
+        max_delay = min(RECONNECT_MAX_DELAY, RECONNECT_MIN_DELAY * 2 ** self.failed_attempts)
+        delay = random.uniform(RECONNECT_MIN_DELAY, max_delay)
+        _LOGGER.info(F'reconnect to the server in {delay:.1f}s')
+        await self.reconnect_timer.start(delay, self._auto_reconnect)
 
     async def _auto_reconnect(self):
         """try to reconnect to the server if disconnected"""
-        if not await self.connect() and not self.connected:
-            await Timer().start(30, self._auto_reconnect)
-        else:
-            if self.get_data:
-                await self.send_data(await self.get_data())
+        if self.connected or self.closing:
+            return
+        self.reconnect_attempts += 1
+        if not await self.connect():
+            WS_RECONNECTS.inc(label='failed')
+            self.failed_attempts += 1
+            await self._schedule_reconnect()
+            return
+        WS_RECONNECTS.inc(label='connected')
+        # the server config can change while disconnected
+        self.hass.async_create_task(self.refresh_config())
+        if self.get_data:
+            await self.send_data(await self.get_data())
 
     @staticmethod
     async def set_status(zone: str, status: State):
         """update the status in the zone"""
         if not status:
             return
-        if not WSClient._ws:
+        if not WSClient._writer:
+            return
+        WSClient._writer.set_state(zone, status)
+
+    @staticmethod
+    async def set_statuses(statuses: dict[str, State]):
+        """update the status of several zones in a single frame"""
+        if not statuses or not WSClient._writer:
             return
-        await WSClient.send_data({'state': {zone: status}})
+        WSClient._writer.set_states(statuses)
 
     @staticmethod
     async def send_data(data: any):
-        """send data to the server"""
-        await WSClient._ws.send_json(data, dumps=lambda obj: json.dumps(obj, cls=JsonEncoder))
+        """queue data to send to the server, return immediately"""
+        if not WSClient._writer:
+            return
+        WSClient._writer.send(data)
+
+    @staticmethod
+    async def _stop_writer():
+        """stop the outbound writer"""
+        if WSClient._writer:
+            await WSClient._writer.stop()
+            WSClient._writer = None
 
     async def set_server_url(self, url: str):
         """Set and store the url to the server"""
@@ -0,0 +1,88 @@
+"""WSDispatcher class"""
+import asyncio
+import json
+from collections import deque
+from typing import Callable, Coroutine, Optional
+
+from custom_components.heatger.shared.logs.logs import Logs
+from custom_components.heatger.shared.metrics.metrics import Metrics
+from custom_components.heatger.websocket.consts import INBOUND_QUEUE_SIZE
+
+CLASSNAME = 'WSDispatcher'
+WS_INBOUND_DROPPED = Metrics().counter('heatger_ws_inbound_dropped_total',
+                                       'Messages from the server dropped because the queue was full', 'type')
+
+
+class WSDispatcher:
+    """Handle the messages received from the server outside of the receive loop.
+    Queued types are handled in order from a bounded queue, before the latest-wins types
+    which only keep their last payload"""
+
+    def __init__(self):
+        self._handlers: dict[str, Callable[[dict], Coroutine]] = {}
+        self._latest_wins: set[str] = set()
+        self._queue: deque[tuple[str, dict]] = deque()
+        self._latest: dict[str, dict] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, message_type: str, handler: Callable[[dict], Coroutine], latest_wins: bool = False) -> None:
+        """register the handler of a message type, the registration order is the matching priority"""
+        self._handlers[message_type] = handler
+        if latest_wins:
+            self._latest_wins.add(message_type)
+
+    def start(self) -> None:
+        """start the handling task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """stop the handling task, pending messages are dropped"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue.clear()
+        self._latest.clear()
+
+    def feed(self, raw: any) -> None:
+        """decode a message and queue it for its handler, unknown messages are ignored"""
+        try:
+            data = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(data, dict):
+            return
+        message_type = next((key for key in self._handlers if key in data), None)
+        if message_type is None:
+            return
+        if message_type in self._latest_wins:
+            self._latest[message_type] = data
+        else:
+            if len(self._queue) >= INBOUND_QUEUE_SIZE:
+                dropped_type = self._queue.popleft()[0]
+                WS_INBOUND_DROPPED.inc(label=dropped_type)
+                Logs.error(CLASSNAME, F'queue full, drop message {dropped_type}')
+            self._queue.append((message_type, data))
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        """handle the queued messages first, then the latest payload of each latest-wins type"""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue or self._latest:
+                if self._queue:
+                    message_type, data = self._queue.popleft()
+                else:
+                    message_type = next(iter(self._latest))
+                    data = self._latest.pop(message_type)
+                try:
+                    await self._handlers[message_type](data)
+                except Exception as e:  # pylint: disable=broad-except
+                    Logs.error(CLASSNAME, F'{message_type} handler failed: {e!r}')
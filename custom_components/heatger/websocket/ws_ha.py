@@ -1,35 +1,53 @@
 """WS endpoints register"""
+from typing import Any, Callable
+
 import voluptuous as vol
 from homeassistant.components.websocket_api import decorators, async_register_command
 from homeassistant.core import callback, HomeAssistant
 from homeassistant.helpers import config_validation as cv
 
 from custom_components.heatger.const import DOMAIN
+from custom_components.heatger.zone.consts import MAX_TRANSITIONS, MAX_HORIZON_HOURS
 from custom_components.heatger.zone.zone_manager import ZoneManager
 from custom_components.heatger.local_storage.config.config import Config
 
 
+def send_config_result(connection, data, config: Config, key: str, build: Callable[[], Any]):
+    """Send a config read result encoded once per config revision.
+    A client giving its revision receives {revision, data}, or {revision, not_modified} if it is up to date"""
+    if 'revision' in data and data['revision'] == config.revision:
+        connection.send_result(data["id"], {'revision': config.revision, 'not_modified': True})
+        return
+    payload = config.get_encoded(key, build)
+    if 'revision' in data:
+        payload = F'{{"revision":{config.revision},"data":{payload}}}'
+    connection.send_message(F'{{"id":{data["id"]},"type":"result","success":true,"result":{payload}}}')
+
+
 @callback
 @decorators.websocket_command({
     vol.Required("type"): "heatger_get_prog",
-    vol.Required("zone_id"): cv.string
+    vol.Required("zone_id"): cv.string,
+    vol.Optional("revision"): vol.Coerce(int)
 })
 @decorators.async_response
 async def handle_get_prog(hass: HomeAssistant, connection, data):
     """Handle subscribe updates."""
-    result = await Config(hass).get_zone(data['zone_id'])
-    connection.send_result(data["id"], result)
+    config = Config(hass)
+    zone = await config.get_zone(data['zone_id'])
+    send_config_result(connection, data, config, F"prog:{data['zone_id']}", lambda: zone)
 
 
 @callback
 @decorators.websocket_command({
-    vol.Required("type"): "heatger_get_zones"
+    vol.Required("type"): "heatger_get_zones",
+    vol.Optional("revision"): vol.Coerce(int)
 })
 @decorators.async_response
 async def handle_get_zones(hass: HomeAssistant, connection, data):
     """Handle subscribe updates."""
-    result = Config(hass).data.zones
-    connection.send_result(data["id"], result)
+    config = Config(hass)
+    send_config_result(connection, data, config, 'zones', lambda: config.data.zones)
 
 
 @callback
@@ -56,6 +74,30 @@ async def handle_get_frostfree_info(hass: HomeAssistant, connection, data):
     connection.send_result(data["id"], result)
 
 
+@callback
+@decorators.websocket_command({
+    vol.Required("type"): "heatger_get_transitions",
+    vol.Optional("count"): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_TRANSITIONS)),
+    vol.Optional("hours"): vol.All(vol.Coerce(float), vol.Range(min=0, max=MAX_HORIZON_HOURS)),
+})
+def handle_get_transitions(hass: HomeAssistant, connection, data):
+    """Send the next transitions of all zones and frost-free."""
+    zm: ZoneManager = hass.data[DOMAIN]['zone_manager']
+    connection.send_result(data["id"], zm.get_transitions(data.get('count'), data.get('hours')))
+
+
+@callback
+@decorators.websocket_command({
+    vol.Required("type"): "heatger_subscribe"
+})
+def handle_subscribe(hass: HomeAssistant, connection, data):
+    """Send a snapshot of zones and frost-free, then push the changes."""
+    zm: ZoneManager = hass.data[DOMAIN]['zone_manager']
+    connection.subscriptions[data["id"]] = zm.subscriptions.subscribe(connection, data["id"])
+    connection.send_result(data["id"])
+    zm.subscriptions.send_snapshot(connection, data["id"])
+
+
 @callback
 @decorators.websocket_command({
     vol.Required("type"): "heatger_get_available_persons",
@@ -69,12 +111,14 @@ async def handle_get_available_persons(hass: HomeAssistant, connection, data):
 @callback
 @decorators.websocket_command({
     vol.Required("type"): "heatger_get_selected_persons",
+    vol.Optional("revision"): vol.Coerce(int)
 })
 @decorators.async_response
 async def handle_get_selected_persons(hass: HomeAssistant, connection, data):
     """Handle subscribe updates."""
-    result = (await Config(hass).get_config()).users
-    connection.send_result(data["id"], result)
+    config = Config(hass)
+    users = (await config.get_config()).users
+    send_config_result(connection, data, config, 'users', lambda: users)
 
 
 async def async_register_ws(hass):
@@ -98,6 +142,16 @@ async def async_register_ws(hass):
         handle_get_zones_info
     )
 
+    async_register_command(
+        hass,
+        handle_get_transitions
+    )
+
+    async_register_command(
+        hass,
+        handle_subscribe
+    )
+
     async_register_command(
         hass,
         handle_get_available_persons
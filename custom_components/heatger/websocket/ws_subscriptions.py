@@ -0,0 +1,92 @@
+"""WSSubscriptions class"""
+from typing import Any, Callable, Optional
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.heatger.local_storage.json_encoder.serializer import dumps
+
+NEXT_SWITCH = 'nextSwitch'
+DEADLINE = 'deadline'
+
+
+class WSSubscriptions:
+    """Push the zones and frost-free changes to the subscribed frontend connections.
+    get_snapshot returns {'zones': {zone_id: data}, 'frostfree': data}, each data holding a 'deadline' key
+    used to detect a new timer, the remaining time is sent in its place"""
+
+    def __init__(self, hass: HomeAssistant, get_snapshot: Callable[[], dict]):
+        self.hass = hass
+        self.get_snapshot = get_snapshot
+        self.subscribers: dict[tuple[int, int], Any] = {}
+        self._snapshot: Optional[dict] = None
+        self._flush_scheduled = False
+
+    def subscribe(self, connection, msg_id: int) -> Callable[[], None]:
+        """register a connection, return the function removing it"""
+        key = (id(connection), msg_id)
+        self.subscribers[key] = connection
+        return lambda: self.subscribers.pop(key, None)
+
+    def send_snapshot(self, connection, msg_id: int) -> None:
+        """send the full state to a new subscriber"""
+        snapshot = self.get_snapshot()
+        if self._snapshot is None or len(self.subscribers) <= 1:
+            self._snapshot = snapshot
+        connection.send_message(WSSubscriptions._event_message(msg_id, dumps(
+            {'type': 'snapshot',
+             'zones': {zone_id: WSSubscriptions._to_event(data) for zone_id, data in snapshot['zones'].items()},
+             'frostfree': WSSubscriptions._to_event(snapshot['frostfree'])})))
+
+    def notify(self) -> None:
+        """called on each change, the diff is computed once per loop iteration"""
+        if self._flush_scheduled or not self.subscribers:
+            return
+        self._flush_scheduled = True
+        self.hass.loop.call_soon(self._flush)
+
+    def _flush(self) -> None:
+        """send the diff since the last flush to every subscriber, the frame is encoded once"""
+        self._flush_scheduled = False
+        snapshot = self.get_snapshot()
+        previous = self._snapshot or {'zones': {}, 'frostfree': {}}
+        self._snapshot = snapshot
+
+        zones = {}
+        for zone_id, data in snapshot['zones'].items():
+            changes = WSSubscriptions._diff(previous['zones'].get(zone_id, {}), data)
+            if changes:
+                zones[zone_id] = changes
+        for zone_id in previous['zones']:
+            if zone_id not in snapshot['zones']:
+                zones[zone_id] = None
+        diff = {'type': 'diff'}
+        if zones:
+            diff['zones'] = zones
+        frostfree = WSSubscriptions._diff(previous['frostfree'], snapshot['frostfree'])
+        if frostfree:
+            diff['frostfree'] = frostfree
+        if len(diff) == 1:
+            return
+
+        payload = dumps(diff)
+        for (_, msg_id), connection in list(self.subscribers.items()):
+            connection.send_message(WSSubscriptions._event_message(msg_id, payload))
+
+    @staticmethod
+    def _diff(previous: dict, current: dict) -> dict:
+        """return the changed fields, the remaining time is sent only if the deadline changed"""
+        changes = {key: value for key, value in current.items()
+                   if key not in (DEADLINE, NEXT_SWITCH) and previous.get(key) != value}
+        if DEADLINE in current and (not previous or previous.get(DEADLINE) != current[DEADLINE]):
+            changes[NEXT_SWITCH] = current[NEXT_SWITCH]
+        return changes
+
+    @staticmethod
+    def _to_event(data: dict) -> dict:
+        """remove the internal fields"""
+        return {key: value for key, value in data.items() if key != DEADLINE}
+
+    @staticmethod
+    def _event_message(msg_id: int, payload: str) -> str:
+        """build an event message around an already encoded payload"""
+        return F'{{"id":{msg_id},"type":"event","event":{payload}}}'
@@ -0,0 +1,93 @@
+"""WSWriter class"""
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+from aiohttp import ClientWebSocketResponse
+
+from custom_components.heatger.local_storage.json_encoder.serializer import dumps
+from custom_components.heatger.shared.enum.state import State
+from custom_components.heatger.shared.logs.logs import Logs
+from custom_components.heatger.shared.metrics.metrics import Metrics
+from custom_components.heatger.websocket.consts import OUTBOUND_QUEUE_SIZE, FLUSH_WINDOW, SEND_TIMEOUT
+
+CLASSNAME = 'WSWriter'
+WS_FRAMES_OUT = Metrics().counter('heatger_ws_frames_out_total', 'Frames sent to the server', 'result')
+WS_BYTES_OUT = Metrics().counter('heatger_ws_bytes_out_total', 'Bytes sent to the server')
+WS_SEND_SECONDS = Metrics().histogram('heatger_ws_send_seconds', 'Send latency of a frame')
+
+
+class WSWriter:
+    """Send the frames of the WebSocket client from a single task, states are merged per zone"""
+
+    def __init__(self, ws: ClientWebSocketResponse):
+        self._ws = ws
+        self._frames: deque = deque()
+        self._pending_states: dict[str, State] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """start the writer task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """stop the writer task, pending frames are dropped"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:  # pylint: disable=broad-except
+            Logs.error(CLASSNAME, F'writer task failed: {e!r}')
+        self._task = None
+
+    def send(self, data: any) -> None:
+        """queue a frame, the oldest frame is dropped if the queue is full"""
+        if len(self._frames) >= OUTBOUND_QUEUE_SIZE:
+            Logs.error(CLASSNAME, F'queue full, drop frame {self._frames.popleft()}')
+        self._frames.append(data)
+        self._wakeup.set()
+
+    def set_state(self, zone: str, state: State) -> None:
+        """queue the state of a zone, only the last pending state of each zone is sent"""
+        self._pending_states[zone] = state
+        self._wakeup.set()
+
+    def set_states(self, states: dict[str, State]) -> None:
+        """queue the states of several zones, they are sent in the same frame"""
+        self._pending_states.update(states)
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        """wait for frames and send them, the states received in the flush window are merged"""
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(FLUSH_WINDOW)
+            self._wakeup.clear()
+            frames = list(self._frames)
+            self._frames.clear()
+            if self._pending_states:
+                frames.append({'state': self._pending_states})
+                self._pending_states = {}
+            for frame in frames:
+                await self._send(frame)
+
+    async def _send(self, frame: any) -> None:
+        """send a frame with a timeout, a frame that fails must not stop the writer task"""
+        start = time.monotonic()
+        try:
+            data = dumps(frame)
+            async with asyncio.timeout(SEND_TIMEOUT):
+                await self._ws.send_str(data)
+        except Exception as e:  # pylint: disable=broad-except
+            WS_FRAMES_OUT.inc(label='failed')
+            Logs.error(CLASSNAME, F'failed to send frame: {e!r}')
+            return
+        WS_SEND_SECONDS.observe(time.monotonic() - start)
+        WS_FRAMES_OUT.inc(label='sent')
+        WS_BYTES_OUT.inc(len(data))
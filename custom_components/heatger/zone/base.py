@@ -1,6 +1,7 @@
 """Base class"""
 import abc
-from datetime import datetime, time, timedelta
+from datetime import datetime, time, timedelta, timezone
+from typing import Callable, Optional
 
 from custom_components.heatger.shared.timer.timer import Timer
 
@@ -10,6 +11,7 @@ class Base(metaclass=abc.ABCMeta):
     def __init__(self):
         super().__init__()
         self.timer = Timer()
+        self.listener: Optional[Callable[[], None]] = None
 
     @abc.abstractmethod
     def on_time_out(self) -> None:
@@ -20,11 +22,21 @@ class Base(metaclass=abc.ABCMeta):
         """get remaining time before state change"""
         return self.timer.get_remaining_time()
 
+    def get_deadline(self) -> Optional[int]:
+        """get the loop time of the next state change, None if no timer"""
+        return self.timer.get_deadline()
+
+    def notify_change(self) -> None:
+        """inform the listener that the data of the class changed"""
+        if self.listener:
+            self.listener()
+
     @staticmethod
-    def get_next_day(weekday: int, hour: time) -> datetime:
-        """return a datetime"""
-        now = datetime.utcnow()
-        actual_weekday = datetime.utcnow().weekday()
+    def get_next_day(weekday: int, hour: time, now: Optional[datetime] = None) -> datetime:
+        """return the next utc datetime matching weekday and hour, all computed from the same aware now"""
+        if now is None:
+            now = datetime.now(timezone.utc)
+        actual_weekday = now.weekday()
         if actual_weekday > weekday:
             next_day = (7 - actual_weekday) + weekday
         elif actual_weekday == weekday and \
@@ -33,8 +45,7 @@ class Base(metaclass=abc.ABCMeta):
         else:
             next_day = weekday - actual_weekday
 
-        delta = timedelta(days=next_day)
-        result = datetime.fromtimestamp(datetime.utcnow().timestamp() + delta.total_seconds())
+        result = now + timedelta(days=next_day)
         return result.replace(hour=hour.hour, minute=hour.minute, second=0, microsecond=0)
 
     async def stop_loop(self):
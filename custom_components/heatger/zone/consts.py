@@ -8,3 +8,13 @@ MODE = 'mode'
 IS_PING = 'is_ping'
 REGEX_FIND_NUMBER = r"\d"
 HOME = 'home'
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+# a stored schedule is packed as minute of week << PACKED_STATE_BITS | state
+PACKED_STATE_BITS = 2
+PACKED_STATE_MASK = (1 << PACKED_STATE_BITS) - 1
+MAX_PARALLEL_INIT = 10
+DEFAULT_TRANSITIONS = 10
+MAX_TRANSITIONS = 500
+MAX_HORIZON_HOURS = 24 * 7 * 4
+FROSTFREE = 'frostfree'
@@ -4,23 +4,34 @@ from dataclasses import dataclass
 from datetime import time
 
 from custom_components.heatger.shared.enum.state import State
+from custom_components.heatger.zone.consts import MINUTES_PER_DAY, PACKED_STATE_BITS, PACKED_STATE_MASK
 
+# times and states are immutable, the packed loader shares them instead of building one per entry
+_TIMES = tuple(time(minute // 60, minute % 60) for minute in range(MINUTES_PER_DAY))
+_STATES = tuple(State.to_state(value) for value in range(PACKED_STATE_MASK + 1))
+# packed value -> shared schedule view, bounded by the number of packed values
+_VIEWS: dict[int, 'ScheduleDto'] = {}
 
-@dataclass
+
+@dataclass(frozen=True)
 class ScheduleDto:
-    """schedule data object"""
+    """schedule data object, immutable as the instances of the packed progs are shared"""
+    __slots__ = ('day', 'hour', 'state')
 
     # pylint: disable=unused-argument
     def __init__(self, day, hour: time, state, **kwargs):
-        self.day = day
-        self.hour = hour
-        self.state = state
+        object.__setattr__(self, 'day', day)
+        object.__setattr__(self, 'hour', hour)
+        object.__setattr__(self, 'state', state)
 
     def __eq__(self, other: 'ScheduleDto'):
         if other is None:
             return False
         return self.to_value() == other.to_value()
 
+    def __hash__(self):
+        return hash(self.to_value())
+
     def is_valid_schedule(self) -> bool:
         """return True schedule is valid"""
         return 0 <= self.day <= 6 and isinstance(self.hour, time) and isinstance(self.state, State)
@@ -29,6 +40,28 @@ class ScheduleDto:
         """return a schedule in value, the bigger it is, the closer it is to the weekend"""
         return self.day * 10000 + self.hour.hour * 100 + self.hour.minute
 
+    def to_minutes(self) -> int:
+        """return the schedule position in the week, in minutes since monday 00:00"""
+        return self.day * MINUTES_PER_DAY + self.hour.hour * 60 + self.hour.minute
+
+    def to_packed(self) -> int:
+        """return the schedule packed in an int, minute of week and state code"""
+        return self.to_minutes() << PACKED_STATE_BITS | self.state.value
+
+    @staticmethod
+    def from_packed(value: int) -> 'ScheduleDto':
+        """return the schedule of a packed int, the instance is shared"""
+        view = _VIEWS.get(value)
+        if view is None:
+            day, minute = divmod(value >> PACKED_STATE_BITS, MINUTES_PER_DAY)
+            view = _VIEWS[value] = ScheduleDto(day, _TIMES[minute], _STATES[value & PACKED_STATE_MASK])
+        return view
+
+    @staticmethod
+    def minute_of_week(date: datetime.datetime) -> int:
+        """return the position of the given date in the week, in minutes since monday 00:00"""
+        return date.weekday() * MINUTES_PER_DAY + date.hour * 60 + date.minute
+
     def to_object(self) -> {}:
         """return schedule into object"""
         return {'day': self.day,
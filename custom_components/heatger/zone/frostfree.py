@@ -3,9 +3,12 @@ from datetime import datetime
 from typing import Optional
 
 from custom_components.heatger.local_storage.persistence.persistence import Persistence
+from custom_components.heatger.shared.enum.mode import Mode
 from custom_components.heatger.shared.logs.logs import Logs
+from custom_components.heatger.shared.timer.timer import Timer
+from custom_components.heatger.websocket.ws_client import WSClient
 from custom_components.heatger.zone.base import Base
-from custom_components.heatger.zone.zone import Zone
+from custom_components.heatger.zone.zone import Zone, ZONE_TRANSITIONS
 
 CLASSNAME = 'Frost free'
 
@@ -40,25 +43,58 @@ class Frostfree(Base):
     async def on_time_out(self) -> None:
         """called when the timer ended"""
         await self.timer.stop()
-        for zone in self.zones:
-            Logs.info(zone.zone_id, 'Stop frost free')
-            await zone.set_frostfree(False)
+        await self.__apply(False)
 
     async def start(self, end_date: datetime) -> None:
         """Start frost-free with end date"""
         remaining_time = end_date.timestamp() - datetime.now().timestamp()
         await self.timer.start(remaining_time, self.stop)
-        await Persistence(self.hass).set_frost_free_end_date(end_date)
         self.end_date = end_date
-        for zone in self.zones:
-            Logs.info(zone.zone_id, 'Start frost free')
-            await zone.set_frostfree(True)
+        await self.__apply(True)
+        # written with the zones modes
+        await Persistence(self.hass).set_frost_free_end_date(end_date)
+        self.notify_change()
 
     async def stop(self) -> None:
         """stop frost-free"""
         await self.on_time_out()
         self.end_date = None
         await Persistence(self.hass).set_frost_free_end_date()
+        self.notify_change()
+
+    async def __apply(self, activate: bool) -> None:
+        """Apply or remove frost-free on all zones at once: the timers are stopped/started in one pass,
+        the zones are written with one persistence write and their states sent in one frame"""
+        previous_states = {zone.zone_id: zone.current_state for zone in self.zones}
+        if activate:
+            zones = list(self.zones)
+            await Timer.stop_many([zone.timer for zone in zones])
+            for zone in zones:
+                zone.enter_frostfree()
+            persisted = {zone.zone_id: (None, zone.current_mode) for zone in zones}
+        else:
+            # frost-free switched every zone to manual, every zone in manual is resumed in auto,
+            # including a zone set to manual by the user before frost-free
+            zones = [zone for zone in self.zones if zone.current_mode == Mode.MANUAL]
+            timers = []
+            for zone in zones:
+                timeout = zone.leave_frostfree()
+                if timeout is not None:
+                    timers.append((zone.timer, timeout, zone.on_time_out))
+            await Timer.stop_many([zone.timer for zone in zones])
+            await Timer.start_many(timers)
+            persisted = {zone.zone_id: (zone.current_state, zone.current_mode) for zone in zones}
+        Logs.info(CLASSNAME, F'{"Start" if activate else "Stop"} frost free on {len(zones)} zones')
+
+        for zone in zones:
+            if zone.current_state != previous_states[zone.zone_id]:
+                ZONE_TRANSITIONS.inc(label=zone.current_state.name)
+        await Persistence(self.hass).set_zones(persisted)
+        await WSClient.set_statuses({zone.zone_id: zone.current_state for zone in zones})
+        for zone in zones:
+            if zone.is_ping:
+                await zone.ping_users()
+            zone.notify_change()
 
     def get_data(self) -> int:
         """return remaining time in json object"""
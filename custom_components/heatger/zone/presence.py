@@ -0,0 +1,108 @@
+"""Presence class"""
+import asyncio
+from typing import Callable, Coroutine, Iterable, Optional
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from custom_components.heatger.shared.logs.logs import Logs
+from custom_components.heatger.shared.metrics.metrics import Metrics
+from custom_components.heatger.zone.consts import HOME
+
+CLASSNAME = 'Presence'
+PRESENCE_EVENTS = Metrics().counter('heatger_presence_events_total', 'State changes of the watched persons', 'event')
+PRESENCE_RESUMED = Metrics().counter('heatger_presence_resumed_zones_total', 'Zones resumed by a presence')
+
+
+class Presence:
+    """Track the watched persons with a single state change subscription shared by all zones.
+    Zones waiting for someone at home are indexed and resumed in one pass on arrival"""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.users: list[str] = []
+        self.home: set[str] = set()
+        # zone_id -> (callback, users watched by the zone, None for all)
+        self.waiting: dict[str, tuple[Callable[[], Coroutine], Optional[frozenset[str]]]] = {}
+        self.untrack_event: Optional[Callable[[], None]] = None
+
+    def set_users(self, users: Iterable[str]) -> None:
+        """watch the given persons, the subscription is renewed only if the list changed"""
+        users = list(users)
+        if users == self.users and (self.untrack_event or not users):
+            return
+        self.stop()
+        self.users = users
+        self.home = {user for user in users if self.__is_home(self.hass.states.get(user))}
+        if users:
+            self.untrack_event = async_track_state_change_event(self.hass, users, self.__on_state_change)
+        Logs.info(CLASSNAME, F'Watch {len(users)} persons, {len(self.home)} at home')
+        # the new list can release zones, e.g. no one watched anymore
+        found = [zone_id for zone_id, (_, zone_users) in self.waiting.items() if self.is_home(zone_users)]
+        self.__release(found)
+
+    @property
+    def anyone_home(self) -> bool:
+        """True if a watched person is at home or if no one is watched"""
+        return not self.users or bool(self.home)
+
+    def is_home(self, users: Optional[frozenset[str]] = None) -> bool:
+        """True if one of users is at home, all watched persons are checked if None"""
+        if users is None:
+            return self.anyone_home
+        watched = users.intersection(self.users)
+        return not watched or not watched.isdisjoint(self.home)
+
+    async def wait(self, zone_id: str, on_found: Callable[[], Coroutine],
+                   users: Optional[Iterable[str]] = None) -> None:
+        """call on_found as soon as someone is at home, a zone waits only once"""
+        users = frozenset(users) if users is not None else None
+        if self.is_home(users):
+            self.waiting.pop(zone_id, None)
+            await on_found()
+            return
+        self.waiting[zone_id] = (on_found, users)
+
+    def cancel(self, zone_id: str) -> None:
+        """stop waiting for the zone"""
+        self.waiting.pop(zone_id, None)
+
+    @callback
+    def __on_state_change(self, event: Event) -> None:
+        """update the cached presence and resume the waiting zones on arrival"""
+        entity_id = event.data['entity_id']
+        if not self.__is_home(event.data.get('new_state')):
+            if entity_id in self.home:
+                PRESENCE_EVENTS.inc(label='left')
+            self.home.discard(entity_id)
+            return
+        if entity_id in self.home:
+            return
+        PRESENCE_EVENTS.inc(label='arrived')
+        self.home.add(entity_id)
+        Logs.info(CLASSNAME, F'{entity_id} at home')
+        self.__release([zone_id for zone_id, (_, users) in self.waiting.items()
+                        if users is None or entity_id in users])
+
+    def __release(self, zone_ids: list[str]) -> None:
+        """remove the zones from the waiting index and resume them in one task"""
+        if not zone_ids:
+            return
+        callbacks = [self.waiting.pop(zone_id)[0] for zone_id in zone_ids]
+        PRESENCE_RESUMED.inc(len(callbacks))
+        Logs.info(CLASSNAME, F'Resume {len(callbacks)} zones')
+        self.hass.async_create_task(Presence.__resume(callbacks))
+
+    @staticmethod
+    async def __resume(callbacks: list[Callable[[], Coroutine]]) -> None:
+        await asyncio.gather(*(on_found() for on_found in callbacks))
+
+    @staticmethod
+    def __is_home(state) -> bool:
+        return state is not None and state.state == HOME
+
+    def stop(self) -> None:
+        """remove the state change subscription"""
+        if self.untrack_event:
+            self.untrack_event()
+            self.untrack_event = None
@@ -0,0 +1,53 @@
+"""ScheduleIndex class"""
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+from custom_components.heatger.zone.consts import MINUTES_PER_WEEK
+from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
+from custom_components.heatger.zone.schedule_list import ScheduleList
+
+
+class ScheduleIndex:
+    """Compiled program of a zone, sorted by minute of the week for bisect lookups"""
+
+    def __init__(self, schedules: Optional[Iterable[ScheduleDto]] = None):
+        self.schedules = ScheduleList()
+        self.load(schedules or [])
+
+    def load(self, schedules: Iterable[ScheduleDto]) -> None:
+        """rebuild the index from a prog list, a ScheduleList is copied without sorting"""
+        self.schedules = ScheduleList(schedules)
+
+    def next_schedule(self, date: datetime) -> Optional[ScheduleDto]:
+        """return the first schedule strictly after the given date, wrapping to the start of the week"""
+        if not self.schedules:
+            return None
+        position = self.schedules.bisect_right(ScheduleDto.minute_of_week(date))
+        return self.schedules[position % len(self.schedules)]
+
+    def previous_schedule(self, date: datetime) -> Optional[ScheduleDto]:
+        """return the last schedule at or before the given date, wrapping to the end of the week"""
+        if not self.schedules:
+            return None
+        position = self.schedules.bisect_right(ScheduleDto.minute_of_week(date))
+        return self.schedules[position - 1]
+
+    def iter_transitions(self, start: datetime) -> Iterator[tuple[datetime, ScheduleDto]]:
+        """yield (date, schedule) of the transitions strictly after start in date order, week after week"""
+        schedules = self.schedules
+        if not schedules:
+            return
+        start_minutes = ScheduleDto.minute_of_week(start)
+        week_start = start.replace(second=0, microsecond=0) - timedelta(minutes=start_minutes)
+        position = schedules.bisect_right(start_minutes)
+        week = 0
+        while True:
+            if position == len(schedules):
+                position = 0
+                week += 1
+            yield week_start + timedelta(minutes=week * MINUTES_PER_WEEK + schedules.minutes_at(position)), \
+                schedules[position]
+            position += 1
+
+    def __len__(self) -> int:
+        return len(self.schedules)
@@ -0,0 +1,104 @@
+"""ScheduleList class"""
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, Optional, Union
+
+from custom_components.heatger.zone.consts import PACKED_STATE_BITS, PACKED_STATE_MASK
+from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
+
+# MINUTES_PER_WEEK << PACKED_STATE_BITS fits in an unsigned short
+PACKED_TYPECODE = 'H'
+
+
+class ScheduleList:
+    """Prog of a zone, kept sorted as packed ints (minute of week and state code) in an array.
+    Items are returned as shared immutable ScheduleDto views"""
+    __slots__ = ('packed', '_views')
+
+    def __init__(self, schedules: Iterable[Union[ScheduleDto, int]] = ()):
+        self._views: Optional[tuple[ScheduleDto, ...]] = None
+        if isinstance(schedules, ScheduleList):
+            self.packed = array(PACKED_TYPECODE, schedules.packed)
+            self._views = schedules._views
+            return
+        self.packed = array(PACKED_TYPECODE, sorted(
+            schedule if isinstance(schedule, int) else schedule.to_packed() for schedule in schedules))
+
+    def views(self) -> tuple[ScheduleDto, ...]:
+        """return the schedules, resolved once until the next change"""
+        if self._views is None:
+            self._views = tuple(map(ScheduleDto.from_packed, self.packed))
+        return self._views
+
+    def __len__(self) -> int:
+        return len(self.packed)
+
+    def __iter__(self) -> Iterator[ScheduleDto]:
+        return iter(self.views())
+
+    def __getitem__(self, index: int) -> ScheduleDto:
+        return self.views()[index]
+
+    def __contains__(self, schedule: ScheduleDto) -> bool:
+        """True if a schedule exists at the same day and hour, like ScheduleDto equality"""
+        return self.find(schedule.to_minutes()) >= 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ScheduleList):
+            return self.packed == other.packed
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return F'ScheduleList({[schedule.to_object() for schedule in self]})'
+
+    def minutes_at(self, index: int) -> int:
+        """return the minute of week of the schedule at index"""
+        return self.packed[index] >> PACKED_STATE_BITS
+
+    def bisect_left(self, minutes: int) -> int:
+        """return the position of the first schedule at or after minutes"""
+        return bisect_left(self.packed, minutes << PACKED_STATE_BITS)
+
+    def bisect_right(self, minutes: int) -> int:
+        """return the position of the first schedule strictly after minutes"""
+        return bisect_right(self.packed, minutes << PACKED_STATE_BITS | PACKED_STATE_MASK)
+
+    def find(self, minutes: int) -> int:
+        """return the position of the schedule at minutes, -1 if not found"""
+        position = self.bisect_left(minutes)
+        if position < len(self.packed) and self.packed[position] >> PACKED_STATE_BITS == minutes:
+            return position
+        return -1
+
+    def add(self, schedule: ScheduleDto) -> bool:
+        """insert a schedule at its sorted position, return False if one exists at the same day and hour"""
+        minutes = schedule.to_minutes()
+        position = self.bisect_left(minutes)
+        if position < len(self.packed) and self.packed[position] >> PACKED_STATE_BITS == minutes:
+            return False
+        self.packed.insert(position, schedule.to_packed())
+        self._views = None
+        return True
+
+    def update(self, schedules: Iterable[ScheduleDto]) -> None:
+        """insert several schedules with a single sort"""
+        self.packed = array(PACKED_TYPECODE, sorted([*self.packed, *(schedule.to_packed() for schedule in schedules)]))
+        self._views = None
+
+    def remove(self, schedule: ScheduleDto) -> None:
+        """remove the schedule at the same day and hour, raise ValueError if not found"""
+        position = self.find(schedule.to_minutes())
+        if position < 0:
+            raise ValueError(F'no schedule on day {schedule.day} at {schedule.hour} in prog')
+        del self.packed[position]
+        self._views = None
+
+    def clear(self) -> None:
+        """remove all schedules"""
+        del self.packed[:]
+        self._views = None
+
+    def has_duplicates(self) -> bool:
+        """True if two schedules are at the same day and hour"""
+        return any(self.packed[i] >> PACKED_STATE_BITS == self.packed[i + 1] >> PACKED_STATE_BITS
+                   for i in range(len(self.packed) - 1))
@@ -1,13 +1,12 @@
 """Zone class"""
+import math
 import re
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Dict
 
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ServiceNotFound
-from homeassistant.helpers.event import async_track_state_change
-from homeassistant.core import State as HAState
 
 from custom_components.heatger.websocket.ws_client import WSClient
 from custom_components.heatger.local_storage.config.config import Config
@@ -15,15 +14,21 @@ from custom_components.heatger.local_storage.persistence.persistence import Pers
 from custom_components.heatger.shared.enum.mode import Mode
 from custom_components.heatger.shared.enum.state import State
 from custom_components.heatger.shared.logs.logs import Logs
+from custom_components.heatger.shared.metrics.metrics import Metrics
 from custom_components.heatger.zone.base import Base
-from custom_components.heatger.zone.consts import ZONE, REGEX_FIND_NUMBER, HOME
+from custom_components.heatger.zone.consts import ZONE, REGEX_FIND_NUMBER
 from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
+from custom_components.heatger.zone.dto.zone_dto import ZoneDto
+from custom_components.heatger.zone.presence import Presence
+from custom_components.heatger.zone.schedule_index import ScheduleIndex
+
+ZONE_TRANSITIONS = Metrics().counter('heatger_zone_transitions_total', 'State changes of the zones', 'state')
 
 
 class Zone(Base):
     """This class define a new heaters zone"""
 
-    def __init__(self, hass, number: int):
+    def __init__(self, hass, number: int, presence: Presence):
         """Initialize class"""
         super().__init__()
         self.hass: HomeAssistant = hass
@@ -33,16 +38,21 @@ class Zone(Base):
         self.current_mode = Mode.AUTO
         self.next_state = State.ECO
         self.is_ping = False
-        self.untrack_event = None
+        self.presence = presence
+        self.schedule_index: Optional[ScheduleIndex] = None
+        self.armed_schedule: Optional[ScheduleDto] = None
+        self.armed_target: Optional[datetime] = None
         self.initialized = False
 
-    async def async_init(self):
-        """Initialize state of class"""
+    async def async_init(self, config: Optional[ZoneDto] = None):
+        """Initialize state of class, config is read from the Config class if not given"""
         if self.initialized:
             return
-        config = await Config(self.hass).get_zone(F"{ZONE}{self.zone_id}")
+        if config is None:
+            config = await Config(self.hass).get_zone(F"{ZONE}{self.zone_id}")
         self.zone_id = F"{ZONE}{self.zone_id}"
         self.name = config.name
+        self.schedule_index = Config(self.hass).get_schedule_index(self.zone_id)
         await self.__restore_state()
         self.initialized = True
 
@@ -58,7 +68,7 @@ class Zone(Base):
         Logs.info('INFO2', 'RESTORE')
         await self.set_state(State.ECO)
 
-        next_schedule = await self.get_next_schedule()
+        next_schedule = self.get_next_schedule()
         if next_schedule is not None and next_schedule.state == State.ECO:
             await self.launch_ping()
 
@@ -68,6 +78,7 @@ class Zone(Base):
             self.current_mode = Mode.MANUAL
             await self.timer.stop()
             self.is_ping = False
+            self.presence.cancel(self.zone_id)
         else:
             self.current_mode = Mode.AUTO
             await self.start_next_timer()
@@ -75,76 +86,83 @@ class Zone(Base):
         Logs.info(self.zone_id, "Mode set to " + self.current_mode.name)
         if self.current_mode == Mode.AUTO:
             await self.__restore_state()
+        self.notify_change()
 
     async def start_next_timer(self) -> None:
         """Launch next timer (mode Auto)"""
         if self.current_mode != Mode.AUTO:
             return
-        next_schedule = await self.get_next_schedule()
+        next_schedule = self.get_next_schedule()
+        remaining_time = self.__arm(next_schedule)
         if next_schedule is None:
+            await self.timer.stop()
+            self.notify_change()
             return
 
-        remaining_time = self.get_remaining_time_from_schedule(next_schedule)
-
         Logs.info(self.zone_id, F'Selected schedule -> {next_schedule.to_object()}')
 
         self.next_state = next_schedule.state
         await self.timer.start(remaining_time, self.on_time_out)
+        self.notify_change()
         Logs.info(self.zone_id, F'next timeout in {str(remaining_time)}s')
 
-    async def get_next_schedule(self) -> Optional[ScheduleDto]:
-        """get the current and next schedule in prog list"""
-        zone_config = await Config(self.hass).get_zone(self.zone_id)
-        list_schedules = zone_config.prog
-        if list_schedules is None or len(list_schedules) == 0:
-            return None
+    async def reload(self) -> None:
+        """Apply a prog change, the timer is re-armed only if the next transition changed"""
+        self.schedule_index = Config(self.hass).get_schedule_index(self.zone_id)
+        if self.current_mode != Mode.AUTO:
+            return
+        next_schedule = self.get_next_schedule()
+        if Zone.__same_transition(next_schedule, self.armed_schedule):
+            return
+        Logs.info(self.zone_id, 'Next transition changed, re-arm timer')
+        await self.start_next_timer()
 
-        current_schedule = ScheduleDto(datetime.utcnow().weekday(), datetime.utcnow().time(), State.ECO)
-        next_schedule: Optional[ScheduleDto] = None
-        for schedule in list_schedules:
-            if current_schedule.to_value() < schedule.to_value():
-                next_schedule = schedule
-                break
-        if not next_schedule:
-            next_schedule = list_schedules[0]
-        return next_schedule
+    def __arm(self, schedule: Optional[ScheduleDto]) -> Optional[int]:
+        """remember the schedule armed and its wall clock target, return the seconds until the target"""
+        self.armed_schedule = schedule
+        if schedule is None:
+            self.armed_target = None
+            return None
+        now = datetime.now(timezone.utc)
+        self.armed_target = Zone.get_next_day(schedule.day, schedule.hour, now)
+        return math.ceil((self.armed_target - now).total_seconds())
 
     @staticmethod
-    def get_remaining_time_from_schedule(schedule: ScheduleDto) -> int:
-        """Return the remaining time between the next schedule and now"""
-        schedule_date = Zone.get_next_day(schedule.day, schedule.hour)
-        return int(schedule_date.timestamp() - datetime.utcnow().timestamp())
+    def __same_transition(first: Optional[ScheduleDto], second: Optional[ScheduleDto]) -> bool:
+        """return True if both schedules trigger the same state at the same time"""
+        if first is None or second is None:
+            return first is second
+        return first.to_minutes() == second.to_minutes() and first.state == second.state
+
+    def get_next_schedule(self) -> Optional[ScheduleDto]:
+        """get the next schedule in prog list"""
+        if self.schedule_index is None:
+            return None
+        return self.schedule_index.next_schedule(datetime.now(timezone.utc))
+
+    def get_current_schedule(self) -> Optional[ScheduleDto]:
+        """get the last schedule reached in prog list"""
+        if self.schedule_index is None:
+            return None
+        return self.schedule_index.previous_schedule(datetime.now(timezone.utc))
 
     async def launch_ping(self) -> None:
         """Start users presence check"""
         self.is_ping = True
+        self.notify_change()
         await self.ping_users()
 
     async def ping_users(self) -> None:
-        """Users presence check"""
+        """Users presence check, wait for someone at home with the shared presence tracker"""
         if not self.is_ping:
             return
-        users = (await Config(self.hass).get_config()).users
-        if len(users) == 0:
-            await self.on_ip_found()
-            return
-        for user in users:
-            user = self.hass.states.get(user)
-            if user and user.state == HOME:
-                await self.on_ip_found()
-                return
-        self.untrack_event = async_track_state_change(self.hass, users, self.user_state_change_callback)
-
-    async def user_state_change_callback(self, entity_id: str, old_state: HAState, new_state: HAState):
-        """handle new state of entity"""
-        if new_state.state == HOME:
-            await self.on_ip_found()
-            self.untrack_event()
-            self.untrack_event = None
+        await self.presence.wait(self.zone_id, self.on_ip_found)
 
     async def set_state(self, state: State) -> None:
         """change state"""
         Logs.info(self.zone_id, F'zone {self.name} switch {self.current_state.name} to {state.name}')
+        if state != self.current_state:
+            ZONE_TRANSITIONS.inc(label=state.name)
         self.current_state = state
         if state != State.FROSTFREE:
             await Persistence(self.hass).set_state(self.zone_id, state)
@@ -154,6 +172,7 @@ class Zone(Base):
             Logs.error(self.zone_id, 'Failure to call service')
         except ServiceNotFound:
             Logs.error(self.zone_id, 'Service not found !')
+        self.notify_change()
 
     async def on_ip_found(self) -> None:
         """Called when ip found on network(Ping class)"""
@@ -165,10 +184,21 @@ class Zone(Base):
     async def on_time_out(self) -> None:
         """Called when timeout fired"""
         Logs.info(self.zone_id, F'timeout zone {self.name}')
-        # stop tracking event
-        if self.untrack_event:
-            self.untrack_event()
-            self.untrack_event = None
+        now = datetime.now(timezone.utc)
+        if self.armed_target is not None and now < self.armed_target:
+            # the timer fired early (wall clock stepped back), wait until the target is reached
+            remaining_time = math.ceil((self.armed_target - now).total_seconds())
+            Logs.info(self.zone_id, F'timeout before the target, re-armed in {remaining_time}s')
+            await self.timer.start(remaining_time, self.on_time_out)
+            self.notify_change()
+            return
+        # the timer fired late (loop blocked, host suspended), apply the latest transition missed
+        current_schedule = self.get_current_schedule()
+        if current_schedule is not None and not Zone.__same_transition(current_schedule, self.armed_schedule):
+            Logs.info(self.zone_id, F'missed transitions, catch up to {current_schedule.to_object()}')
+            self.next_state = current_schedule.state
+        # stop waiting for presence
+        self.presence.cancel(self.zone_id)
         # Wait 5 sec before starting next timer
         await self.timer.start(5, self.start_next_timer)
 
@@ -177,6 +207,7 @@ class Zone(Base):
         else:
             await self.set_state(self.next_state)
             self.is_ping = False
+        self.notify_change()
 
     async def toggle_state(self) -> None:
         """Switch state Comfort <> Eco"""
@@ -191,9 +222,36 @@ class Zone(Base):
             if self.current_mode == Mode.AUTO:
                 await self.toggle_mode()
             self.is_ping = False
+            self.presence.cancel(self.zone_id)
             await self.set_state(State.FROSTFREE)
         elif self.current_mode == Mode.MANUAL:
             await self.toggle_mode()
+        self.notify_change()
+
+    def enter_frostfree(self) -> None:
+        """Switch to frost-free without IO, used by the bulk frost-free, the timer is stopped by the caller"""
+        self.current_mode = Mode.MANUAL
+        self.is_ping = False
+        self.presence.cancel(self.zone_id)
+        self.current_state = State.FROSTFREE
+
+    def leave_frostfree(self) -> Optional[int]:
+        """Switch back to auto without IO, used by the bulk frost-free.
+        Return the timeout of the next schedule, None if the zone has no schedule"""
+        self.current_mode = Mode.AUTO
+        self.current_state = State.ECO
+        next_schedule = self.get_next_schedule()
+        remaining_time = self.__arm(next_schedule)
+        if next_schedule is None:
+            return None
+        self.next_state = next_schedule.state
+        # the current period is a comfort period, wait for someone at home
+        if next_schedule.state == State.ECO:
+            if self.presence.anyone_home:
+                self.current_state = State.COMFORT
+            else:
+                self.is_ping = True
+        return remaining_time
 
     def get_data(self) -> Dict:
         """return information zone in json object"""
@@ -216,4 +274,5 @@ class Zone(Base):
     async def stop_loop(self):
         """Stop the loop"""
         self.is_ping = False
+        self.presence.cancel(self.zone_id)
         await super().stop_loop()
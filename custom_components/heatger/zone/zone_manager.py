@@ -1,18 +1,28 @@
 """Zone manager class"""
-from datetime import datetime
-from typing import Optional
+import asyncio
+import heapq
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import islice, takewhile
+from typing import Callable, Iterator, Optional
 import voluptuous as vol
 
-from homeassistant.core import ServiceCall, HomeAssistant
+from homeassistant.core import ServiceCall, HomeAssistant, ServiceResponse, SupportsResponse
 from homeassistant.helpers import config_validation as cv
 
 from custom_components.heatger.const import DOMAIN
 from custom_components.heatger.shared.logs.logs import Logs
-from custom_components.heatger.zone.consts import ZONE, CLASSNAME
+from custom_components.heatger.zone.consts import ZONE, CLASSNAME, MAX_PARALLEL_INIT, DEFAULT_TRANSITIONS, \
+    MAX_TRANSITIONS, MAX_HORIZON_HOURS, FROSTFREE
+from custom_components.heatger.local_storage.json_encoder.serializer import to_primitive
 from custom_components.heatger.local_storage.config.config import Config
+from custom_components.heatger.shared.enum.mode import Mode
 from custom_components.heatger.shared.enum.state import State
 from custom_components.heatger.shared.timer.timer import Timer
+from custom_components.heatger.websocket.ws_subscriptions import WSSubscriptions
 from custom_components.heatger.zone.frostfree import Frostfree
+from custom_components.heatger.zone.dto.zone_dto import ZoneDto
+from custom_components.heatger.zone.presence import Presence
 from custom_components.heatger.zone.zone import Zone
 
 
@@ -24,12 +34,17 @@ class ZoneManager:
         self.zones: list[Zone] = []
         self.frostfree: Optional[Frostfree] = None
         self.current_datas = {}
+        self.init_durations: dict[str, float] = {}
+        self.remove_config_listener: Optional[Callable[[], None]] = None
         self.update_datas_timer = Timer()
         self.hass = hass
+        self.subscriptions = WSSubscriptions(hass, self.get_state_snapshot)
+        self.presence = Presence(hass)
 
     async def run(self) -> None:
         await self.init_zones()
         await self.init_frost_free()
+        self.remove_config_listener = Config(self.hass).add_listener(self.reconcile_zones)
         await self.services_register()
         await self.get_all_data()
 
@@ -37,7 +52,7 @@ class ZoneManager:
         """zones initializer"""
         for zone in self.zones:
             await zone.stop_loop()
-        self.zones = []
+        self.zones.clear()
         try:
             await self.init_zones_from_config_file()
         except KeyError:
@@ -45,15 +60,56 @@ class ZoneManager:
             pass
 
     async def init_zones_from_config_file(self) -> None:
-        """Initialize zones from config file"""
-        i = 1
-        zones = (await Config(self.hass).get_config()).zones
-        while zones[F"{ZONE}{i}"] is not None:
-            Logs.info("Manager", F"Init Zone {i}")
-            zone = Zone(self.hass, i)
-            await zone.async_init()
-            self.zones.append(zone)
-            i += 1
+        """Initialize zones from config file, all zones are built then initialized concurrently"""
+        config = await Config(self.hass).get_config()
+        self.presence.set_users(config.users)
+        zones_config = dict(config.zones)
+        zones = [Zone(self.hass, int(zone_id[len(ZONE):]), self.presence) for zone_id in zones_config]
+        for zone in zones:
+            zone.listener = self.subscriptions.notify
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_INIT)
+
+        async def init_zone(zone: Zone, zone_config: ZoneDto) -> None:
+            async with semaphore:
+                start = time.monotonic()
+                await zone.async_init(zone_config)
+                self.init_durations[zone.zone_id] = time.monotonic() - start
+                Logs.info("Manager", F"Init {zone.zone_id} in {self.init_durations[zone.zone_id] * 1000:.1f}ms")
+
+        start = time.monotonic()
+        await asyncio.gather(*(init_zone(zone, zone_config) for zone, zone_config in zip(zones, zones_config.values())))
+        self.zones.extend(zones)
+        Logs.info("Manager", F"{len(zones)} zones initialized in {(time.monotonic() - start) * 1000:.1f}ms")
+
+    async def reconcile_zones(self, changed_zones: Optional[set[str]] = None) -> None:
+        """Apply the config to the live zones, only added, removed or changed zones are touched.
+        Called by Config after each commit with the ids of the changed zones, all zones are checked if None"""
+        config = await Config(self.hass).get_config()
+        self.presence.set_users(config.users)
+        zones_config = config.zones
+        live_zones = {zone.zone_id: zone for zone in self.zones}
+        zones: list[Zone] = []
+        for zone_id, zone_config in zones_config.items():
+            zone = live_zones.pop(zone_id, None)
+            if zone is not None and zone.name == zone_config.name:
+                if changed_zones is None or zone_id in changed_zones:
+                    await zone.reload()
+            else:
+                if zone is not None:
+                    await zone.stop_loop()
+                Logs.info("Manager", F"Init {zone_id}")
+                zone = Zone(self.hass, int(zone_id[len(ZONE):]), self.presence)
+                zone.listener = self.subscriptions.notify
+                await zone.async_init(zone_config)
+                if self.frostfree and self.frostfree.end_date:
+                    await zone.set_frostfree(True)
+            zones.append(zone)
+        for zone in live_zones.values():
+            Logs.info("Manager", F"Remove {zone.zone_id}")
+            await zone.stop_loop()
+        # update in place, frost-free keeps a reference on this list
+        self.zones[:] = zones
+        self.subscriptions.notify()
 
     async def services_register(self):
         """Registering Services in HA"""
@@ -61,14 +117,25 @@ class ZoneManager:
             vol.Required("zone"): cv.positive_int,
             vol.Required("type"): cv.string,
         })
+        transitions_schema = vol.Schema({
+            vol.Optional("count"): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_TRANSITIONS)),
+            vol.Optional("hours"): vol.All(vol.Coerce(float), vol.Range(min=0, max=MAX_HORIZON_HOURS)),
+        })
         try:
             self.hass.services.async_register(DOMAIN, 'toggle', self.processing_zone, schema=service_schema)
+            self.hass.services.async_register(DOMAIN, 'get_transitions', self.processing_transitions,
+                                              schema=transitions_schema, supports_response=SupportsResponse.ONLY)
         except Exception as e:
             Logs.error('ERT', "Error registering service: " + e.__str__())
 
+    async def processing_transitions(self, call: ServiceCall) -> ServiceResponse:
+        """return the upcoming transitions"""
+        return {'transitions': to_primitive(self.get_transitions(call.data.get('count'), call.data.get('hours')))}
+
     async def init_frost_free(self) -> None:
         """Frost-free initializer"""
         self.frostfree = Frostfree(self.hass, self.zones)
+        self.frostfree.listener = self.subscriptions.notify
         await self.frostfree.async_init()
 
     async def processing_zone(self, call: ServiceCall) -> bool:
@@ -127,6 +194,57 @@ class ZoneManager:
             data[zone.zone_id] = zone.get_data()
         return data
 
+    def get_state_snapshot(self) -> dict:
+        """return the zones and frost-free data pushed to the subscribers"""
+        zones = {}
+        for zone in self.zones:
+            data = zone.get_data()
+            data['deadline'] = zone.get_deadline()
+            zones[zone.zone_id] = data
+        frostfree = {'nextSwitch': -1, 'deadline': None}
+        if self.frostfree:
+            frostfree = {'nextSwitch': self.frostfree.get_data(), 'deadline': self.frostfree.get_deadline()}
+        return {'zones': zones, 'frostfree': frostfree}
+
+    def get_transitions(self, count: Optional[int] = None, hours: Optional[float] = None) -> list[dict]:
+        """return the next count transitions, or those of the next hours, of all zones and frost-free.
+        The compiled schedules of each zone are already sorted, they are merged lazily"""
+        now = datetime.now(timezone.utc)
+        frostfree_end = None
+        if self.frostfree and self.frostfree.end_date:
+            frostfree_end = self.frostfree.end_date.astimezone(timezone.utc)
+
+        sources = []
+        if frostfree_end and frostfree_end > now:
+            sources.append(iter([(frostfree_end, {'zone': FROSTFREE, 'name': FROSTFREE, 'state': None})]))
+        for zone in self.zones:
+            if zone.current_mode == Mode.AUTO:
+                start = now
+            elif frostfree_end and frostfree_end > now:
+                # zones are switched back to auto at the end of frost-free
+                start = frostfree_end
+            else:
+                continue
+            sources.append(self.__zone_transitions(zone, start))
+
+        transitions = heapq.merge(*sources, key=lambda transition: transition[0])
+        if hours is not None:
+            end = now + timedelta(hours=hours)
+            transitions = takewhile(lambda transition: transition[0] <= end, transitions)
+            if count is not None:
+                transitions = islice(transitions, count)
+        else:
+            transitions = islice(transitions, count or DEFAULT_TRANSITIONS)
+        return [{'time': date.isoformat(), 'in': int((date - now).total_seconds()), **data}
+                for date, data in islice(transitions, MAX_TRANSITIONS)]
+
+    @staticmethod
+    def __zone_transitions(zone: Zone, start: datetime) -> Iterator[tuple[datetime, dict]]:
+        if zone.schedule_index is None:
+            return iter(())
+        return ((date, {'zone': zone.zone_id, 'name': zone.name, 'state': schedule.state})
+                for date, schedule in zone.schedule_index.iter_transitions(start))
+
     async def get_frostfree_info(self) -> int:
         """Returns the time remaining before the end of the frost-free period, otherwise -1"""
         return self.frostfree.get_data()
@@ -136,9 +254,14 @@ class ZoneManager:
         Logs.info('ZONE_MANAGER', F'receipt new state: {zone} -> {state}')
         self.zones[await Zone.get_zone_number(self.hass, zone) - 1].current_state = state
         self.hass.states.async_set(F"{DOMAIN}.{zone}", state.name)
+        self.subscriptions.notify()
 
     async def stop_loop(self):
         """Stop all event loop"""
+        if self.remove_config_listener:
+            self.remove_config_listener()
+            self.remove_config_listener = None
         for zone in self.zones:
             await zone.stop_loop()
+        self.presence.stop()
         await self.frostfree.stop_loop()
@@ -0,0 +1 @@
+"""Benchmarks of the integration hot paths."""
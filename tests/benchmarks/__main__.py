@@ -0,0 +1,18 @@
+"""Run every benchmark and print the results as json, to compare runs.
+
+Run with: python -m tests.benchmarks > results.json
+"""
+import asyncio
+import json
+import logging
+import platform
+
+from tests.benchmarks import bench_hot_paths, bench_schedule_list, bench_serializer
+
+if __name__ == '__main__':
+    logging.disable(logging.INFO)
+    results = asyncio.run(bench_hot_paths.run([10, 100, 1000]))
+    results['meta']['python'] = platform.python_version()
+    results['serializer'] = bench_serializer.run()
+    results['schedule_list'] = bench_schedule_list.run()
+    print(json.dumps(results, indent=2))
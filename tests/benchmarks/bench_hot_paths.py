@@ -0,0 +1,210 @@
+"""Benchmarks of the scheduling, persistence and messaging hot paths, run on in-memory stand-ins.
+
+Run with: python -m tests.benchmarks.bench_hot_paths [--zones 10 100 1000]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import statistics
+import time
+
+from custom_components.heatger.const import DOMAIN
+from custom_components.heatger.local_storage.config.config import Config
+from custom_components.heatger.local_storage.persistence.persistence import Persistence
+from custom_components.heatger.shared.enum.state import State
+from custom_components.heatger.websocket.ws_client import WSClient
+from custom_components.heatger.websocket.ws_dispatcher import WS_INBOUND_DROPPED
+from custom_components.heatger.websocket.ws_writer import WSWriter
+from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
+from custom_components.heatger.zone.zone_manager import ZoneManager
+from tests.benchmarks.stand_ins import FakeHass, FakeServerWS, install, make_config
+
+
+def _stats(samples: list[float]) -> dict:
+    """Return the min and median of samples given in seconds, in milliseconds."""
+    return {'min_ms': round(min(samples) * 1e3, 3), 'median_ms': round(statistics.median(samples) * 1e3, 3),
+            'runs': len(samples)}
+
+
+async def _start_manager(hass: FakeHass, zones: int, schedules_per_day: int = 4) -> ZoneManager:
+    install(hass, make_config(zones, schedules_per_day))
+    await Persistence(hass).init_data()
+    await Config(hass).get_config()
+    manager = ZoneManager(hass)
+    hass.data[DOMAIN] = {'zone_manager': manager}
+    await manager.run()
+    return manager
+
+
+async def bench_zone_manager_run(zones: int, repeat: int) -> dict:
+    """ZoneManager.run on a fresh integration."""
+    samples = []
+    for _ in range(repeat):
+        hass = FakeHass()
+        start = time.perf_counter()
+        manager = await _start_manager(hass, zones)
+        samples.append(time.perf_counter() - start)
+        await manager.stop_loop()
+    return {'zones': zones, **_stats(samples)}
+
+
+async def bench_config_load(zones: int, version: int, repeat: int, schedules_per_day: int = 24) -> dict:
+    """Config.get_config on a cold start, the version 1 file is migrated."""
+    samples = []
+    stored_bytes = 0
+    for _ in range(repeat):
+        hass = FakeHass()
+        install(hass, make_config(zones, schedules_per_day), version)
+        stored_bytes = len(hass.storage['heatger-config'])
+        start = time.perf_counter()
+        await Config(hass).get_config()
+        samples.append(time.perf_counter() - start)
+        await hass.async_flush_stores()
+    return {'zones': zones, 'version': version, 'stored_bytes': stored_bytes, **_stats(samples)}
+
+
+async def bench_get_next_schedule(schedules_per_day: int, number: int) -> dict:
+    """Zone.get_next_schedule on a dense weekly program."""
+    hass = FakeHass()
+    manager = await _start_manager(hass, 1, schedules_per_day)
+    zone = manager.zones[0]
+    start = time.perf_counter()
+    for _ in range(number):
+        zone.get_next_schedule()
+    elapsed = time.perf_counter() - start
+    await manager.stop_loop()
+    return {'schedules': 7 * schedules_per_day, 'us_per_call': round(elapsed / number * 1e6, 3)}
+
+
+async def bench_add_schedules(schedules_per_day: int, repeat: int) -> dict:
+    """Config.add_schedules with a full week payload on an empty zone."""
+    hass = FakeHass()
+    install(hass, make_config(1, 0))
+    config = Config(hass)
+    await config.get_config()
+    step = 24 * 60 // schedules_per_day
+    payload = [ScheduleDto(day, datetime.time((i * step) // 60, (i * step) % 60), State(i % 2))
+               for day in range(7) for i in range(schedules_per_day)]
+    samples = []
+    for _ in range(repeat):
+        await config.remove_all_schedule('zone1')
+        start = time.perf_counter()
+        await config.add_schedules('zone1', list(payload))
+        samples.append(time.perf_counter() - start)
+    return {'schedules': len(payload), **_stats(samples)}
+
+
+async def bench_frostfree_persistence(zones: int) -> dict:
+    """Store writes and state frames produced by a frost-free start and stop."""
+    hass = FakeHass()
+    manager = await _start_manager(hass, zones)
+    server = FakeServerWS()
+    WSClient._writer = WSWriter(server)
+    WSClient._writer.start()
+    await hass.async_flush_stores()
+    hass.reset_counters()
+
+    result = {'zones': zones}
+    end_date = (datetime.datetime.now() + datetime.timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    for step, action in (('start', lambda: manager.toggle_frost_free(end_date)),
+                         ('stop', manager.toggle_frost_free)):
+        frames = len(server.frames)
+        start = time.perf_counter()
+        await action()
+        elapsed = time.perf_counter() - start
+        await hass.async_flush_stores()
+        # let the writer flush its window
+        await asyncio.sleep(0.1)
+        result[step] = {'ms': round(elapsed * 1e3, 3),
+                        'store_writes': hass.writes.get('heatger-persist', 0),
+                        'store_bytes': hass.written_bytes.get('heatger-persist', 0),
+                        'state_frames': len(server.frames) - frames}
+        hass.reset_counters()
+
+    await WSClient._writer.stop()
+    WSClient._writer = None
+    await manager.stop_loop()
+    return result
+
+
+class _CountingCoordinator:
+    """Coordinator stand-in counting the telemetry updates."""
+
+    def __init__(self):
+        self.updates = 0
+
+    def async_set_updated_values(self, values: dict) -> None:
+        self.updates += 1
+
+
+async def bench_eval_message(messages: int) -> dict:
+    """Receive loop of WSClient and dispatch of a burst of server messages."""
+    hass = FakeHass()
+    install(hass, make_config(2))
+    await Config(hass).get_config()
+    temperature = _CountingCoordinator()
+    electric_meter = _CountingCoordinator()
+    hass.data[DOMAIN] = {'temp_coordinator': temperature, 'em_coordinator': electric_meter}
+    states = []
+
+    async def updated_data(zone: str, state: State) -> None:
+        states.append((zone, state))
+
+    client = WSClient(hass, None, updated_data)
+    server = FakeServerWS()
+    for i in range(messages):
+        if i % 3 == 0:
+            server.push({'state': {'zone1': i % 2, 'zone2': (i + 1) % 2}})
+        elif i % 3 == 1:
+            server.push({'temperature': {'temperature': 20 + i % 10 / 10, 'humidity': 40, 'pressure': 1000}})
+        else:
+            server.push({'electric_meter': {'hc': i, 'hp': i}})
+    server.push_close()
+
+    dropped = sum(WS_INBOUND_DROPPED.values.values())
+    client.closing = True
+    client.connected = True
+    client.dispatcher.start()
+    start = time.perf_counter()
+    await client.events(server)
+    received = time.perf_counter() - start
+    # pylint: disable=protected-access
+    while client.dispatcher._queue or client.dispatcher._latest:
+        await asyncio.sleep(0)
+    handled = time.perf_counter() - start
+    await client.dispatcher.stop()
+    return {'messages': messages,
+            'received_per_s': round(messages / received),
+            'handled_per_s': round(messages / handled),
+            'state_handled': len(states),
+            'telemetry_handled': temperature.updates + electric_meter.updates,
+            'dropped': sum(WS_INBOUND_DROPPED.values.values()) - dropped}
+
+
+async def run(zones: list[int], repeat: int = 3) -> dict:
+    """Run every benchmark, return the results as a json object."""
+    return {
+        'meta': {'date': datetime.datetime.now().isoformat(timespec='seconds'), 'repeat': repeat},
+        'zone_manager_run': [await bench_zone_manager_run(count, repeat) for count in zones],
+        'config_load': [await bench_config_load(count, version, repeat) for count in zones for version in (1, 2)],
+        'get_next_schedule': [await bench_get_next_schedule(per_day, 10000) for per_day in (4, 96, 288)],
+        'add_schedules': [await bench_add_schedules(per_day, repeat) for per_day in (24, 96)],
+        'frostfree_persistence': [await bench_frostfree_persistence(count) for count in zones],
+        'eval_message': await bench_eval_message(10000),
+    }
+
+
+def main() -> None:
+    """Run the benchmarks with the command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--zones', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    print(json.dumps(asyncio.run(run(args.zones, args.repeat)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
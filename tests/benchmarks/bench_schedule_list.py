@@ -0,0 +1,69 @@
+"""Benchmark of the memory and the operations of a zone prog, list of ScheduleDto against ScheduleList.
+
+Run with: python -m tests.benchmarks.bench_schedule_list
+"""
+import datetime
+import json
+import timeit
+import tracemalloc
+
+from custom_components.heatger.shared.enum.state import State
+from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
+from custom_components.heatger.zone.schedule_list import ScheduleList
+
+
+def _legacy_prog(schedules_per_day: int) -> list[ScheduleDto]:
+    """Prog built like before, one ScheduleDto and one time per entry."""
+    step = 24 * 60 // schedules_per_day
+    return [ScheduleDto(day, datetime.time((i * step) // 60, (i * step) % 60), State(i % 2))
+            for day in range(7) for i in range(schedules_per_day)]
+
+
+def _allocated(build) -> tuple[object, int]:
+    """Return the result of build and the bytes it allocated."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, allocated
+
+
+def run(schedules_per_day: int = 96, zones: int = 100, number: int = 200) -> dict:
+    """Return the memory of zones progs and the time per call in microseconds of both containers."""
+    packed = [schedule.to_packed() for schedule in _legacy_prog(schedules_per_day)]
+    legacy, legacy_bytes = _allocated(lambda: [_legacy_prog(schedules_per_day) for _ in range(zones)])
+    compact, compact_bytes = _allocated(lambda: [ScheduleList(packed) for _ in range(zones)])
+    legacy_prog, compact_prog = legacy[0], compact[0]
+    other_legacy, other_compact = list(legacy[1]), ScheduleList(compact[1])
+    probe = ScheduleDto(6, datetime.time(23, 59), State.ECO)
+
+    def legacy_add():
+        prog = list(legacy_prog)
+        prog.append(probe)
+        prog.sort(key=ScheduleDto.to_value)
+
+    def compact_add():
+        ScheduleList(compact_prog).add(probe)
+
+    operations = {
+        'sort': (lambda: sorted(legacy_prog, key=ScheduleDto.to_value), lambda: ScheduleList(compact_prog)),
+        'equality': (lambda: [s.to_value() for s in legacy_prog] == [s.to_value() for s in other_legacy],
+                     lambda: compact_prog == other_compact),
+        'lookup': (lambda: probe in legacy_prog, lambda: probe in compact_prog),
+        'add': (legacy_add, compact_add),
+        'iterate': (lambda: sum(1 for _ in legacy_prog), lambda: sum(1 for _ in compact_prog)),
+    }
+    results = {'schedules': len(packed), 'zones': zones,
+               'memory': {'list_bytes': legacy_bytes, 'schedule_list_bytes': compact_bytes,
+                          'ratio': round(legacy_bytes / compact_bytes, 1)}}
+    for name, (legacy_op, compact_op) in operations.items():
+        legacy_us = timeit.timeit(legacy_op, number=number) / number * 1e6
+        compact_us = timeit.timeit(compact_op, number=number) / number * 1e6
+        results[name] = {'list_us': round(legacy_us, 2), 'schedule_list_us': round(compact_us, 2),
+                         'speedup': round(legacy_us / compact_us, 2)}
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
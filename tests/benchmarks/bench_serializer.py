@@ -0,0 +1,78 @@
+"""Micro-benchmark of the serializer against the former JSONEncoder path.
+
+Run with: python -m tests.benchmarks.bench_serializer
+"""
+import datetime
+import json
+import timeit
+from json import JSONEncoder
+
+from custom_components.heatger.local_storage.config.dto.config_dto import ConfigDto
+from custom_components.heatger.local_storage.json_encoder.serializer import dumps
+from custom_components.heatger.shared.enum.mode import Mode
+from custom_components.heatger.shared.enum.state import State
+from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
+from custom_components.heatger.zone.dto.zone_dto import ZoneDto
+from custom_components.heatger.zone.schedule_list import ScheduleList
+
+
+class _LegacyEncoder(JSONEncoder):
+    """Baseline, the former JsonEncoder of the integration.
+
+    Completed with the dataclass fallback used by the Home Assistant store.
+    """
+
+    def default(self, o):
+        """Return a serializable version of o."""
+        if isinstance(o, (State, Mode)):
+            return o.value
+        if isinstance(o, (datetime.time, datetime.datetime)):
+            return o.isoformat()
+        if isinstance(o, ScheduleList):
+            return list(o)
+        if hasattr(o, '__slots__'):
+            return {key: getattr(o, key) for key in o.__slots__}
+        return {key: value for key, value in vars(o).items() if not key.startswith('_')}
+
+
+def _legacy_dumps(obj) -> str:
+    return json.dumps(obj, cls=_LegacyEncoder)
+
+
+def state_payload(zones: int) -> dict:
+    """State frame sent to the server."""
+    return {'state': {F'zone{i}': State.COMFORT if i % 2 else State.ECO for i in range(1, zones + 1)}}
+
+
+def zones_info_payload(zones: int) -> dict:
+    """Zones info sent to the frontend."""
+    return {F'zone{i}': {'name': F'Zone {i}', 'state': State.ECO, 'mode': Mode.AUTO,
+                         'nextSwitch': 3600, 'isPing': False} for i in range(1, zones + 1)}
+
+
+def config_payload(zones: int, schedules_per_day: int = 8) -> ConfigDto:
+    """Config stored on disk."""
+    prog = [ScheduleDto(day, datetime.time((i * 3) % 24, 0), State.COMFORT if i % 2 else State.ECO)
+            for day in range(7) for i in range(schedules_per_day)]
+    return ConfigDto({F'zone{i}': ZoneDto(F'Zone {i}', True, list(prog)) for i in range(1, zones + 1)}, [])
+
+
+def run(number: int = 200) -> dict:
+    """Return the time per call in microseconds of both paths for each payload."""
+    payloads = {
+        'state_10_zones': state_payload(10),
+        'zones_info_50_zones': zones_info_payload(50),
+        'config_20_zones': config_payload(20),
+    }
+    results = {}
+    for name, payload in payloads.items():
+        assert json.loads(_legacy_dumps(payload)) == json.loads(dumps(payload))
+        legacy = timeit.timeit(lambda: _legacy_dumps(payload), number=number) / number * 1e6
+        fast = timeit.timeit(lambda: dumps(payload), number=number) / number * 1e6
+        results[name] = {'legacy_us': round(legacy, 2), 'serializer_us': round(fast, 2),
+                         'speedup': round(legacy / fast, 2)}
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
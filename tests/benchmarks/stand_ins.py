@@ -0,0 +1,243 @@
+"""In-memory stand-ins for the Home Assistant objects and the heatger server used by the benchmarks."""
+import asyncio
+import datetime
+import json
+from collections import deque
+from typing import Any, Callable, Optional
+
+import aiohttp
+
+from custom_components.heatger.local_storage import local_storage
+from custom_components.heatger.local_storage.config import config as config_module
+from custom_components.heatger.local_storage.config.config import Config
+from custom_components.heatger.local_storage.config.config_store import ConfigStore, migrate_packed_prog
+from custom_components.heatger.local_storage.consts import CONFIG_STORE_VERSION
+from custom_components.heatger.local_storage.persistence.persistence import Persistence
+from custom_components.heatger.local_storage.server_config.server_config import ServerConfig
+from custom_components.heatger.shared.timer.scheduler import Scheduler
+from custom_components.heatger.websocket.ws_client import WSClient
+from custom_components.heatger.zone.frostfree import Frostfree
+
+
+class MemoryStore:
+    """Store keeping the data in a dict with its version, counts the writes and their size."""
+
+    def __init__(self, hass: 'FakeHass', version: int, key: str, **kwargs):
+        """Initialize an empty store."""
+        self.hass = hass
+        self.version = version
+        self.key = key
+        self._delay_handle: Optional[asyncio.TimerHandle] = None
+        self._delay_func: Optional[Callable[[], Any]] = None
+
+    async def async_load(self) -> Any:
+        """Return the stored data, migrated if stored in another version."""
+        encoded = self.hass.storage.get(self.key)
+        if encoded is None:
+            return None
+        stored = json.loads(encoded)
+        if stored['version'] != self.version:
+            # pylint: disable=no-member
+            return await self._async_migrate_func(stored['version'], 1, stored['data'])
+        return stored['data']
+
+    async def async_save(self, data: Any) -> None:
+        """Write the data now."""
+        self.__cancel_delay()
+        encoded = json.dumps({'version': self.version, 'data': data})
+        self.hass.storage[self.key] = encoded
+        self.hass.writes[self.key] = self.hass.writes.get(self.key, 0) + 1
+        self.hass.written_bytes[self.key] = self.hass.written_bytes.get(self.key, 0) + len(encoded)
+
+    def async_delay_save(self, data_func: Callable[[], Any], delay: float = 0) -> None:
+        """Write the data returned by data_func after delay seconds."""
+        self.__cancel_delay()
+        self._delay_func = data_func
+        self._delay_handle = self.hass.loop.call_later(delay, self.__write_delayed)
+        self.hass.delayed_stores.add(self)
+
+    async def async_flush(self) -> None:
+        """Write the pending delayed save now."""
+        if self._delay_func is not None:
+            await self.async_save(self._delay_func())
+
+    def __write_delayed(self) -> None:
+        self.hass.loop.create_task(self.async_flush())
+
+    def __cancel_delay(self) -> None:
+        if self._delay_handle is not None:
+            self._delay_handle.cancel()
+        self._delay_handle = None
+        self._delay_func = None
+
+
+class MemoryConfigStore(MemoryStore, ConfigStore):
+    """MemoryStore running the config migrations."""
+
+
+class FakeState:
+    """State of an entity."""
+
+    def __init__(self, entity_id: str, state: str):
+        """Initialize the state."""
+        self.entity_id = entity_id
+        self.state = state
+
+
+class FakeStates:
+    """Stand-in for hass.states."""
+
+    def __init__(self):
+        """Initialize without states."""
+        self._states: dict[str, FakeState] = {}
+
+    def get(self, entity_id: str) -> Optional[FakeState]:
+        """Return the state of an entity."""
+        return self._states.get(entity_id)
+
+    def async_set(self, entity_id: str, state: str, *args, **kwargs) -> None:
+        """Set the state of an entity."""
+        self._states[entity_id] = FakeState(entity_id, state)
+
+    def async_all(self, domain: Optional[str] = None) -> list[FakeState]:
+        """Return the states, of a domain if given."""
+        return [state for entity_id, state in self._states.items()
+                if domain is None or entity_id.startswith(F'{domain}.')]
+
+
+class FakeServices:
+    """Stand-in for hass.services."""
+
+    def __init__(self):
+        """Initialize without services."""
+        self.services: dict[tuple[str, str], Callable] = {}
+
+    def async_register(self, domain: str, service: str, service_func: Callable, schema=None, **kwargs) -> None:
+        """Register a service."""
+        self.services[(domain, service)] = service_func
+
+    def has_service(self, domain: str, service: str) -> bool:
+        """Return True if the service is registered."""
+        return (domain, service) in self.services
+
+
+class FakeConfig:
+    """Stand-in for hass.config."""
+
+    @staticmethod
+    def path(*args: str) -> str:
+        """Return the path in the config directory."""
+        return '/'.join(args)
+
+
+class FakeHass:
+    """HomeAssistant object with in-memory states, services and storage."""
+
+    def __init__(self):
+        """Initialize on the running loop."""
+        self.loop = asyncio.get_running_loop()
+        self.data: dict = {}
+        self.states = FakeStates()
+        self.services = FakeServices()
+        self.config = FakeConfig()
+        self.storage: dict[str, str] = {}
+        self.writes: dict[str, int] = {}
+        self.written_bytes: dict[str, int] = {}
+        self.delayed_stores: set[MemoryStore] = set()
+
+    def async_create_task(self, target, *args, **kwargs) -> asyncio.Task:
+        """Run target in a task."""
+        return self.loop.create_task(target)
+
+    def async_create_background_task(self, target, name=None, **kwargs) -> asyncio.Task:
+        """Run target in a task."""
+        return self.loop.create_task(target)
+
+    async def async_flush_stores(self) -> None:
+        """Write the delayed saves without waiting their delay."""
+        for store in list(self.delayed_stores):
+            await store.async_flush()
+        self.delayed_stores.clear()
+
+    def reset_counters(self) -> None:
+        """Reset the write counters."""
+        self.writes.clear()
+        self.written_bytes.clear()
+
+
+class FakeServerWS:
+    """Client side of a WebSocket connected to the heatger server, the server messages are queued with push."""
+
+    def __init__(self):
+        """Initialize an open socket."""
+        self._messages: deque[aiohttp.WSMessage] = deque()
+        self._wakeup = asyncio.Event()
+        self.frames: list[str] = []
+        self.closed = False
+
+    def push(self, data: Any) -> None:
+        """Queue a message sent by the server."""
+        self._messages.append(aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, json.dumps(data), None))
+        self._wakeup.set()
+
+    def push_close(self) -> None:
+        """Queue the close of the socket by the server."""
+        self._messages.append(aiohttp.WSMessage(aiohttp.WSMsgType.CLOSED, None, None))
+        self._wakeup.set()
+
+    async def receive(self) -> aiohttp.WSMessage:
+        """Return the next message sent by the server."""
+        # a socket read yields to the loop even when data is available
+        await asyncio.sleep(0)
+        while not self._messages:
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        return self._messages.popleft()
+
+    async def send_str(self, data: str) -> None:
+        """Record a frame sent to the server."""
+        self.frames.append(data)
+
+    async def close(self) -> None:
+        """Close the socket."""
+        self.closed = True
+
+    @property
+    def sent_bytes(self) -> int:
+        """Return the size of the frames sent."""
+        return sum(len(frame) for frame in self.frames)
+
+
+def install(hass: FakeHass, config: Optional[dict] = None, version: int = CONFIG_STORE_VERSION) -> None:
+    """Reset the singletons of the integration and back the stores with memory.
+
+    config is given in the version 1 format and stored in version.
+    """
+    local_storage.Store = MemoryStore
+    config_module.ConfigStore = MemoryConfigStore
+    Config._instance = None
+    Config._initialized = False
+    Persistence._instance = None
+    Persistence._initialized = False
+    ServerConfig._instance = None
+    ServerConfig._initialized = False
+    Frostfree._initialized = False
+    Scheduler._instance = None
+    WSClient._ws = None
+    WSClient._writer = None
+    if config is not None:
+        data = migrate_packed_prog(config) if version >= 2 else config
+        hass.storage['heatger-config'] = json.dumps({'version': version, 'data': data})
+
+
+def make_config(zones: int, schedules_per_day: int = 4, users: Optional[list[str]] = None) -> dict:
+    """Return a stored config with zones alternating comfort and eco during the day."""
+    step = 24 * 60 // max(schedules_per_day, 1)
+    prog = [{'day': day,
+             'hour': datetime.time((i * step) // 60, (i * step) % 60).isoformat(),
+             'state': i % 2}
+            for day in range(7) for i in range(schedules_per_day)]
+    return {'zones': {F'zone{i}': {'name': F'Zone {i}', 'enabled': True, 'prog': prog}
+                      for i in range(1, zones + 1)},
+            'users': users or [],
+            'ws_url': 'http://heatger.local'}
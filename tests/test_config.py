@@ -0,0 +1,56 @@
+"""Test the config mutations."""
+import asyncio
+from datetime import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.heatger.local_storage.config.config import Config
+from custom_components.heatger.local_storage.config.dto.config_dto import ConfigDto
+from custom_components.heatger.local_storage.config.errors.zone_not_found_error import ZoneNotFoundError
+from custom_components.heatger.shared.enum.state import State
+from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
+
+PROG = [ScheduleDto(0, time(8, 0), State.ECO)]
+
+
+def _config() -> Config:
+    """Return a config with two zones."""
+    Config._instance = None
+    Config._initialized = False
+    config = Config(MagicMock())
+    config.data = ConfigDto({'zone1': {'name': 'Living room', 'enabled': True, 'prog': []},
+                             'zone2': {'name': 'Bedroom', 'enabled': True, 'prog': []}}, [])
+    return config
+
+
+async def test_replace_progs():
+    """Test the changed progs are written and the unchanged zones are not returned."""
+    config = _config()
+    with patch.object(Config, '_write', AsyncMock()) as write:
+        assert await config.replace_progs({'zone1': PROG, 'zone2': []}) == ['zone1']
+    write.assert_awaited_once()
+    assert list(config.data.zones['zone1'].prog) == PROG
+
+
+async def test_replace_progs_of_a_zone_removed_meanwhile():
+    """Test a zone renumbered by a concurrent removal is reported as not found."""
+    config = _config()
+    released = asyncio.Event()
+
+    async def write(_self, _data):
+        """Wait for the test, the write of the removal is slow."""
+        await released.wait()
+
+    with patch.object(Config, '_write', write):
+        removal = asyncio.create_task(config.remove_zone('Living room'))
+        await asyncio.sleep(0)
+        replace = asyncio.create_task(config.replace_progs({'zone2': PROG}))
+        await asyncio.sleep(0)
+        released.set()
+        await removal
+        with pytest.raises(ZoneNotFoundError):
+            await replace
+    assert list(config.data.zones) == ['zone1']
+    assert config.data.zones['zone1'].name == 'Bedroom'
+    assert list(config.data.zones['zone1'].prog) == []
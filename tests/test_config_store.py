@@ -0,0 +1,41 @@
+"""Test the migrations of the config file."""
+from custom_components.heatger.local_storage.config.config_store import ConfigStore
+from custom_components.heatger.local_storage.config.dto.config_dto import ConfigDto
+from custom_components.heatger.local_storage.consts import CONFIG_STORE_VERSION
+from custom_components.heatger.local_storage.json_encoder.serializer import config_to_storage, to_primitive
+
+KEY = 'heatger-config'
+CONFIG_V1 = {
+    'zones': {
+        'zone1': {'name': 'Living room', 'enabled': True,
+                  'prog': [{'day': 0, 'hour': '08:00:00', 'state': 1},
+                           {'day': 2, 'hour': '18:30:00', 'state': 0}]},
+        'zone2': {'name': 'Bedroom', 'enabled': False, 'prog': []},
+    },
+    'users': ['person.someone'],
+    'ws_url': 'http://192.168.1.10',
+}
+
+
+async def test_migrate_config_v1(hass, hass_storage):
+    """Test a version 1 file is loaded with packed progs and restores the same DTOs."""
+    hass_storage[KEY] = {'version': 1, 'minor_version': 1, 'key': KEY, 'data': CONFIG_V1}
+    data = await ConfigStore(hass, CONFIG_STORE_VERSION, KEY).async_load()
+
+    # minute of week << 2 | state
+    assert data['zones']['zone1']['prog'] == [(8 * 60) << 2 | 1, (2 * 24 * 60 + 18 * 60 + 30) << 2 | 0]
+    assert data['zones']['zone2']['prog'] == []
+    assert data['users'] == CONFIG_V1['users']
+    assert data['ws_url'] == CONFIG_V1['ws_url']
+
+    config = ConfigDto(**data)
+    assert to_primitive(config) == CONFIG_V1
+    assert config_to_storage(config) == data
+
+
+async def test_load_config_v2(hass, hass_storage):
+    """Test a version 2 file is loaded as is."""
+    data = {'zones': {'zone1': {'name': 'Living room', 'enabled': True, 'prog': [1921]}},
+            'users': [], 'ws_url': None}
+    hass_storage[KEY] = {'version': CONFIG_STORE_VERSION, 'minor_version': 1, 'key': KEY, 'data': data}
+    assert await ConfigStore(hass, CONFIG_STORE_VERSION, KEY).async_load() == data
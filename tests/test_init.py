@@ -1,9 +1,30 @@
 """Test component setup."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
 from homeassistant.setup import async_setup_component
 
+from custom_components.heatger import async_unload_entry
 from custom_components.heatger.const import DOMAIN
 
 
 async def test_async_setup(hass):
     """Test the component gets setup."""
     assert await async_setup_component(hass, DOMAIN, {}) is True
+
+
+@patch('custom_components.heatger.async_unregister_panel', AsyncMock())
+@patch('custom_components.heatger.Scheduler')
+@patch('custom_components.heatger.Persistence')
+async def test_async_unload_entry_disconnects_the_server(persistence, scheduler):
+    """Test the WebSocket client is disconnected when the entry is unloaded."""
+    persistence.return_value.async_flush = AsyncMock()
+    ws = MagicMock(disconnect=AsyncMock())
+    zone_manager = MagicMock(stop_loop=AsyncMock())
+    hass = MagicMock()
+    hass.data = {DOMAIN: {'WS': ws, 'zone_manager': zone_manager}}
+
+    assert await async_unload_entry(hass, MagicMock()) is True
+    ws.disconnect.assert_awaited_once()
+    zone_manager.stop_loop.assert_awaited_once()
+    scheduler.return_value.stop.assert_called_once()
+    assert 'WS' not in hass.data[DOMAIN]
@@ -0,0 +1,99 @@
+"""Test the array-backed zone prog."""
+from dataclasses import FrozenInstanceError
+from datetime import time
+
+import pytest
+
+from custom_components.heatger.shared.enum.state import State
+from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
+from custom_components.heatger.zone.schedule_list import ScheduleList
+
+
+def _schedule(day: int, hour: int, minute: int, state: State = State.ECO) -> ScheduleDto:
+    return ScheduleDto(day, time(hour, minute), state)
+
+
+def _values(prog: ScheduleList) -> list[tuple[int, time, State]]:
+    return [(schedule.day, schedule.hour, schedule.state) for schedule in prog]
+
+
+def test_schedules_are_sorted_by_minute_of_week():
+    """Test the prog is sorted whatever the order of the given schedules."""
+    prog = ScheduleList([_schedule(3, 10, 0), _schedule(0, 5, 30, State.COMFORT), _schedule(6, 23, 59)])
+    assert _values(prog) == [(0, time(5, 30), State.COMFORT), (3, time(10, 0), State.ECO),
+                             (6, time(23, 59), State.ECO)]
+    assert len(prog) == 3
+    assert prog[1] == _schedule(3, 10, 0)
+
+
+def test_packed_round_trip():
+    """Test a schedule is restored from its packed value."""
+    schedule = _schedule(4, 17, 45, State.FROSTFREE)
+    restored = ScheduleDto.from_packed(schedule.to_packed())
+    assert (restored.day, restored.hour, restored.state) == (4, time(17, 45), State.FROSTFREE)
+    assert ScheduleList([schedule.to_packed()]) == ScheduleList([schedule])
+
+
+def test_views_are_immutable():
+    """Test the shared views cannot be modified."""
+    prog = ScheduleList([_schedule(0, 8, 0)])
+    with pytest.raises(FrozenInstanceError):
+        prog[0].state = State.COMFORT
+    with pytest.raises(FrozenInstanceError):
+        prog[0].hour = time(9, 0)
+    assert ScheduleList([_schedule(0, 8, 0)])[0].state == State.ECO
+
+
+def test_add():
+    """Test add inserts at the sorted position and refuses a schedule at the same day and hour."""
+    prog = ScheduleList([_schedule(0, 8, 0), _schedule(2, 8, 0)])
+    assert prog.add(_schedule(1, 8, 0))
+    assert not prog.add(_schedule(1, 8, 0, State.COMFORT))
+    assert _values(prog) == [(0, time(8, 0), State.ECO), (1, time(8, 0), State.ECO), (2, time(8, 0), State.ECO)]
+    assert _schedule(1, 8, 0, State.COMFORT) in prog
+    assert _schedule(1, 8, 1) not in prog
+
+
+def test_remove():
+    """Test remove matches the day and hour and raises ValueError if not found."""
+    prog = ScheduleList([_schedule(0, 8, 0), _schedule(1, 8, 0)])
+    prog.remove(_schedule(0, 8, 0, State.COMFORT))
+    assert _values(prog) == [(1, time(8, 0), State.ECO)]
+    with pytest.raises(ValueError):
+        prog.remove(_schedule(0, 8, 0))
+    prog.clear()
+    assert len(prog) == 0
+
+
+def test_update():
+    """Test update merges several schedules in order."""
+    prog = ScheduleList([_schedule(0, 8, 0), _schedule(4, 8, 0)])
+    iterated = list(prog)
+    prog.update([_schedule(6, 8, 0), _schedule(2, 8, 0)])
+    assert [schedule.day for schedule in prog] == [0, 2, 4, 6]
+    assert [schedule.day for schedule in iterated] == [0, 4]
+
+
+def test_duplicates():
+    """Test the duplicate detection compares the day and hour, not the state."""
+    assert not ScheduleList([_schedule(0, 8, 0), _schedule(0, 8, 1)]).has_duplicates()
+    assert ScheduleList([_schedule(0, 8, 0), _schedule(0, 8, 0, State.COMFORT)]).has_duplicates()
+
+
+def test_equality_compares_the_states():
+    """Test two progs differing by a state are not equal."""
+    assert ScheduleList([_schedule(0, 8, 0)]) == ScheduleList([_schedule(0, 8, 0)])
+    assert ScheduleList([_schedule(0, 8, 0)]) != ScheduleList([_schedule(0, 8, 0, State.COMFORT)])
+
+
+def test_bisect():
+    """Test the bisect positions and lookups by minute of week."""
+    prog = ScheduleList([_schedule(0, 8, 0, State.COMFORT), _schedule(0, 12, 0), _schedule(1, 8, 0)])
+    minutes = 12 * 60
+    assert prog.bisect_left(minutes) == 1
+    assert prog.bisect_right(minutes) == 2
+    assert prog.bisect_left(minutes + 1) == 2
+    assert prog.bisect_right(0) == 0
+    assert prog.find(minutes) == 1
+    assert prog.find(minutes + 1) == -1
+    assert prog.minutes_at(2) == 24 * 60 + 8 * 60
@@ -0,0 +1,143 @@
+"""Test the shared timer scheduler."""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.heatger.shared.timer import scheduler
+from custom_components.heatger.shared.timer.scheduler import COMPACT_MIN_SIZE, Scheduler
+from custom_components.heatger.shared.timer.timer import Timer
+
+
+def _recorder(fired: list, name: str):
+    """Return a timeout callback appending name to fired."""
+    async def callback():
+        fired.append(name)
+    return callback
+
+
+class WallClock:
+    """Time module of the scheduler, the wall clock is shifted by offset seconds."""
+
+    offset = 0
+
+    @classmethod
+    def time(cls) -> float:
+        """Return the shifted wall clock."""
+        return time.time() + cls.offset
+
+
+@pytest.fixture(autouse=True)
+def stop_scheduler():
+    """Stop the scheduler after each test."""
+    yield
+    Scheduler().stop()
+
+
+async def test_entries_fire_in_deadline_order():
+    """Test the entries fire by deadline, then in scheduling order for equal deadlines."""
+    fired = []
+    Scheduler().schedule(0.03, _recorder(fired, 'third'))
+    Scheduler().schedule(0.01, _recorder(fired, 'first'))
+    Scheduler().schedule_many([(0.02, _recorder(fired, 'second')), (0.02, _recorder(fired, 'second bis'))])
+    await asyncio.sleep(0.06)
+    assert fired == ['first', 'second', 'second bis', 'third']
+    assert Scheduler().active_count() == 0
+
+
+async def test_cancel_and_reschedule():
+    """Test a cancelled entry never fires and a rescheduled entry fires once with the new callback."""
+    fired = []
+    cancelled = Scheduler().schedule(0.01, _recorder(fired, 'cancelled'))
+    Scheduler().cancel(cancelled)
+    Scheduler().cancel(cancelled)
+    entry = Scheduler().schedule(0.01, _recorder(fired, 'old'))
+    entry = Scheduler().reschedule(entry, 0.02, _recorder(fired, 'new'))
+    assert Scheduler().active_count() == 1
+    await asyncio.sleep(0.04)
+    assert fired == ['new']
+    assert not entry.active
+
+
+async def test_timer_restart_replaces_its_entry():
+    """Test restarting a timer keeps a single pending entry."""
+    fired = []
+    timer = Timer()
+    await timer.start(0.01, _recorder(fired, 'first'))
+    await timer.start(0.02, _recorder(fired, 'second'))
+    assert Scheduler().active_count() == 1
+    await asyncio.sleep(0.04)
+    assert fired == ['second']
+    assert timer.get_deadline() is None
+
+
+async def test_cancelled_entries_are_compacted():
+    """Test the heap drops the cancelled entries once they are the majority."""
+    fired = []
+    entries = [Scheduler().schedule(100, _recorder(fired, str(i))) for i in range(2 * COMPACT_MIN_SIZE + 2)]
+    # the latest entries, the cancelled entries at the top of the heap are dropped at once
+    for entry in entries[-COMPACT_MIN_SIZE:]:
+        Scheduler().cancel(entry)
+    # pylint: disable=protected-access
+    assert len(Scheduler()._heap) == len(entries)
+    Scheduler().cancel_many(entries[-COMPACT_MIN_SIZE - 2:-COMPACT_MIN_SIZE])
+    assert len(Scheduler()._heap) == COMPACT_MIN_SIZE
+    assert Scheduler()._cancelled == 0
+    assert Scheduler().active_count() == COMPACT_MIN_SIZE
+    assert all(entry.active for entry in Scheduler()._heap)
+    Scheduler().cancel_many(entries)
+
+
+async def test_remaining():
+    """Test the remaining time of pending, cancelled and missing entries."""
+    entry = Scheduler().schedule(10, _recorder([], 'entry'))
+    assert 9.9 < Scheduler().remaining(entry) <= 10
+    Scheduler().cancel(entry)
+    assert Scheduler().remaining(entry) == -1
+    assert Scheduler().remaining(None) == -1
+
+
+async def test_drift_moves_deadlines_to_their_wall_clock_target():
+    """Test a wall clock jump re-arms the deadlines, the overdue ones fire at once."""
+    fired = []
+    WallClock.offset = 0
+    with patch.object(scheduler, 'time', WallClock):
+        later = Scheduler().schedule(100, _recorder(fired, 'later'))
+        overdue = Scheduler().schedule(30, _recorder(fired, 'overdue'))
+        # the host was suspended 50s, the loop clock did not move
+        WallClock.offset = 50
+        Scheduler()._check_drift()  # pylint: disable=protected-access
+        assert 49 < Scheduler().remaining(later) <= 50
+        assert Scheduler().remaining(overdue) == 0
+        await asyncio.sleep(0.01)
+    assert fired == ['overdue']
+    assert later.active
+    Scheduler().cancel(later)
+
+
+async def test_drift_within_tolerance_keeps_deadlines():
+    """Test a divergence below the tolerance does not move the deadlines."""
+    WallClock.offset = 0
+    with patch.object(scheduler, 'time', WallClock):
+        entry = Scheduler().schedule(100, _recorder([], 'entry'))
+        deadline = entry.deadline
+        WallClock.offset = 0.5
+        Scheduler()._check_drift()  # pylint: disable=protected-access
+    assert entry.deadline == deadline
+    Scheduler().cancel(entry)
+
+
+async def test_no_handle_outlives_the_last_entry():
+    """Test the loop handles are cancelled once no entry is pending, and on stop."""
+    entry = Scheduler().schedule(10, _recorder([], 'entry'))
+    # pylint: disable=protected-access
+    assert Scheduler()._handle is not None and Scheduler()._drift_handle is not None
+    Scheduler().cancel(entry)
+    assert Scheduler()._handle is None and Scheduler()._drift_handle is None
+
+    entry = Scheduler().schedule(10, _recorder([], 'entry'))
+    Scheduler().stop()
+    assert Scheduler()._handle is None and Scheduler()._drift_handle is None
+    assert Scheduler().active_count() == 0
+    assert Scheduler().remaining(entry) == -1
@@ -0,0 +1,74 @@
+"""Test the sensors registration from the server config."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from custom_components.heatger import sensor
+from custom_components.heatger.const import DOMAIN
+from custom_components.heatger.local_storage.server_config.server_config import ServerConfig
+
+CACHED_CONFIG = {'i2c': {'temperature': {'enabled': False}}, 'entry': {'electric_meter': {'enabled': True}}}
+LIVE_CONFIG = {'i2c': {'temperature': {'enabled': True}}, 'entry': {'electric_meter': {'enabled': False}}}
+
+
+def test_server_capabilities():
+    """Test the sensors enabled in a server config."""
+    assert sensor.server_capabilities(None) == set()
+    assert sensor.server_capabilities({}) == set()
+    assert sensor.server_capabilities(CACHED_CONFIG) == {sensor.ELECTRIC_METER}
+    assert sensor.server_capabilities(LIVE_CONFIG) == {sensor.TEMPERATURE}
+
+
+@patch('custom_components.heatger.sensor.SensorCoordinator', MagicMock())
+async def test_live_config_received_during_the_cache_read():
+    """Test a live config received while the cache is read is not overwritten by the cached one."""
+    ServerConfig._instance = None
+    ServerConfig._initialized = False
+    listeners = []
+    ws = MagicMock(config=None)
+    ws.add_config_listener.side_effect = lambda listener: listeners.append(listener) or (lambda: None)
+    hass = MagicMock()
+    hass.data = {DOMAIN: {'WS': ws}}
+    added = []
+
+    reads = []
+    released = asyncio.Event()
+
+    async def read(_self):
+        """Return the cached config, the read of the sensor setup waits for the test."""
+        reads.append(None)
+        if len(reads) == 1:
+            await released.wait()
+        return CACHED_CONFIG
+
+    with patch.object(ServerConfig, '_read', read), patch.object(ServerConfig, '_write', AsyncMock()):
+        setup = asyncio.create_task(sensor.async_setup_entry(hass, MagicMock(), added.extend))
+        await asyncio.sleep(0)
+        assert reads
+        # the server sends its config, like WSClient._on_config
+        ws.config = LIVE_CONFIG
+        assert await ServerConfig(hass).set_config(LIVE_CONFIG)
+        for listener in listeners:
+            await listener(LIVE_CONFIG)
+        released.set()
+        await setup
+
+    assert ServerConfig(hass).data == LIVE_CONFIG
+    assert sorted(entity._name for entity in added) == ['humidity', 'pressure', 'temperature']
+
+
+@patch('custom_components.heatger.sensor.async_call_later')
+def test_writes_and_suppressed_values_are_counted(call_later):
+    """Test the written and filtered values of a sensor are exported as metrics."""
+    entity = sensor.TelemetryEntity('temperature', MagicMock(), MagicMock(options={}))
+    entity.async_write_ha_state = MagicMock()
+    written = sensor.SENSOR_WRITES.values.get('temperature', 0)
+    suppressed = sensor.SENSOR_SUPPRESSED.values.get('temperature', 0)
+    entity._handle_value(20.0)
+    # in the deadband
+    entity._handle_value(20.05)
+    # in the min interval
+    entity._handle_value(21.0)
+    call_later.assert_called_once()
+    assert sensor.SENSOR_WRITES.values['temperature'] == written + 1
+    assert sensor.SENSOR_SUPPRESSED.values['temperature'] == suppressed + 2
+    assert entity.async_write_ha_state.call_count == 1
@@ -0,0 +1,47 @@
+"""Test the WebSocket client connection lifecycle."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from custom_components.heatger.websocket.ws_client import WSClient
+
+WRITER = MagicMock(return_value=MagicMock(stop=AsyncMock()))
+
+
+def _client() -> WSClient:
+    """Return a client whose server accepts the connection."""
+    with patch('custom_components.heatger.websocket.ws_client.Config'):
+        client = WSClient(MagicMock())
+    client.events = AsyncMock()
+    client.refresh_config = AsyncMock()
+    client.hass.async_create_task.side_effect = lambda coroutine: coroutine.close()
+    return client
+
+
+@patch('custom_components.heatger.websocket.ws_client.WSWriter', WRITER)
+@patch('custom_components.heatger.websocket.ws_client.async_get_clientsession')
+async def test_connect_does_not_ask_the_config(session):
+    """Test a bare connect, as done by the config flow validation, sends no config request."""
+    session.return_value.ws_connect = AsyncMock()
+    client = _client()
+    assert await client.connect()
+    client.hass.async_create_task.assert_not_called()
+    await client.disconnect()
+
+    await client.start()
+    client.hass.async_create_task.assert_called_once()
+    await client.disconnect()
+
+
+@patch('custom_components.heatger.websocket.ws_client.WSWriter', WRITER)
+@patch('custom_components.heatger.websocket.ws_client.async_get_clientsession')
+async def test_disconnect_cancels_the_pending_requests(session):
+    """Test the requests waiting for a reply are cancelled on disconnect."""
+    session.return_value.ws_connect = AsyncMock()
+    client = _client()
+    assert await client.connect()
+    request = asyncio.create_task(client.request('config'))
+    await asyncio.sleep(0)
+    await client.disconnect()
+    await asyncio.sleep(0)
+    assert request.cancelled()
+    assert not client._requests  # pylint: disable=protected-access
@@ -0,0 +1,21 @@
+"""Test the dispatcher of the server messages."""
+import json
+from unittest.mock import AsyncMock, patch
+
+from custom_components.heatger.websocket.ws_dispatcher import WS_INBOUND_DROPPED, WSDispatcher
+
+
+@patch('custom_components.heatger.websocket.ws_dispatcher.INBOUND_QUEUE_SIZE', 2)
+def test_dropped_messages_are_counted():
+    """Test the messages dropped from a full queue are exported as a metric."""
+    dispatcher = WSDispatcher()
+    dispatcher.register('state', AsyncMock())
+    dispatcher.register('temperature', AsyncMock(), latest_wins=True)
+    dropped = WS_INBOUND_DROPPED.values.get('state', 0)
+    for i in range(3):
+        dispatcher.feed(json.dumps({'state': {'zone1': i % 2}}))
+    # latest-wins messages are never queued
+    for _ in range(3):
+        dispatcher.feed(json.dumps({'temperature': {'temperature': 20}}))
+    assert WS_INBOUND_DROPPED.values['state'] == dropped + 1
+    assert 'temperature' not in WS_INBOUND_DROPPED.values
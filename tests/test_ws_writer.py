@@ -0,0 +1,31 @@
+"""Test the outbound writer of the WebSocket client."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from custom_components.heatger.websocket.ws_writer import WS_FRAMES_OUT, WSWriter
+
+
+@patch('custom_components.heatger.websocket.ws_writer.FLUSH_WINDOW', 0)
+async def test_a_bad_frame_does_not_stop_the_writer():
+    """Test the frames queued after a frame that cannot be encoded are still sent."""
+    ws = MagicMock(send_str=AsyncMock())
+    writer = WSWriter(ws)
+    writer.start()
+    failed = WS_FRAMES_OUT.values.get('failed', 0)
+    writer.send(object())
+    writer.send('config')
+    await asyncio.sleep(0.01)
+    ws.send_str.assert_awaited_once_with('"config"')
+    assert WS_FRAMES_OUT.values['failed'] == failed + 1
+    await writer.stop()
+
+
+async def test_stop_a_failed_writer():
+    """Test stopping a writer whose task ended with an error does not raise."""
+    async def fail():
+        raise RuntimeError('failed')
+
+    writer = WSWriter(MagicMock())
+    writer._task = asyncio.create_task(fail())  # pylint: disable=protected-access
+    await asyncio.sleep(0)
+    await writer.stop()
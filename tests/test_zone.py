@@ -0,0 +1,101 @@
+"""Test the zone timeouts and state transitions."""
+from datetime import datetime, time, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.heatger.shared.enum.state import State
+from custom_components.heatger.shared.timer.scheduler import Scheduler
+from custom_components.heatger.zone.dto.schedule_dto import ScheduleDto
+from custom_components.heatger.zone.schedule_index import ScheduleIndex
+from custom_components.heatger.zone.zone import ZONE_TRANSITIONS, Zone
+
+# monday
+START = datetime(2026, 10, 19, 7, 0, tzinfo=timezone.utc)
+PROG = [ScheduleDto(0, time(8, 0), State.ECO),
+        ScheduleDto(0, time(12, 0), State.COMFORT),
+        ScheduleDto(0, time(18, 0), State.ECO)]
+
+
+class FakeClock:
+    """Datetime of the zone module, now is moved by the tests."""
+
+    current = START
+
+    @classmethod
+    def now(cls, tz=None):
+        """Return the time set by the test."""
+        return cls.current
+
+
+@pytest.fixture(autouse=True)
+def stop_scheduler():
+    """Stop the scheduler after each test."""
+    yield
+    Scheduler().stop()
+
+
+async def _armed_zone() -> Zone:
+    """Return a zone in auto mode armed at START on the 08:00 schedule."""
+    zone = Zone(MagicMock(), 1, MagicMock())
+    zone.zone_id = 'zone1'
+    zone.schedule_index = ScheduleIndex(PROG)
+    zone.set_state = AsyncMock()
+    zone.launch_ping = AsyncMock()
+    FakeClock.current = START
+    await zone.start_next_timer()
+    assert zone.armed_schedule.to_minutes() == 8 * 60
+    return zone
+
+
+@patch('custom_components.heatger.zone.zone.datetime', FakeClock)
+async def test_on_time_out_on_target():
+    """Test the armed transition is applied when the timer fires on time."""
+    zone = await _armed_zone()
+    FakeClock.current = START.replace(hour=8, second=1)
+    await zone.on_time_out()
+    zone.set_state.assert_awaited_once_with(State.ECO)
+    await zone.stop_loop()
+
+
+@patch('custom_components.heatger.zone.zone.datetime', FakeClock)
+async def test_on_time_out_clock_stepped_forwards():
+    """Test the latest missed transition is applied when the timer fires late."""
+    zone = await _armed_zone()
+    FakeClock.current = START.replace(hour=12, minute=30)
+    await zone.on_time_out()
+    assert zone.next_state == State.COMFORT
+    zone.launch_ping.assert_awaited_once()
+    zone.set_state.assert_not_awaited()
+    await zone.stop_loop()
+
+
+@patch('custom_components.heatger.zone.zone.datetime', FakeClock)
+async def test_on_time_out_clock_stepped_backwards():
+    """Test an early timeout re-arms on the armed target instead of applying the previous period."""
+    zone = await _armed_zone()
+    FakeClock.current = START.replace(minute=50)
+    await zone.on_time_out()
+    zone.set_state.assert_not_awaited()
+    zone.launch_ping.assert_not_awaited()
+    assert zone.armed_schedule.to_minutes() == 8 * 60
+    assert 599 <= Scheduler().remaining(zone.timer.entry) <= 600
+
+    FakeClock.current = START.replace(hour=8)
+    await zone.on_time_out()
+    zone.set_state.assert_awaited_once_with(State.ECO)
+    await zone.stop_loop()
+
+
+@patch('custom_components.heatger.zone.zone.Persistence')
+@patch('custom_components.heatger.zone.zone.WSClient.set_status', AsyncMock())
+async def test_transitions_count_state_changes_only(persistence):
+    """Test the transitions metric ignores a state sent again."""
+    persistence.return_value.set_state = AsyncMock()
+    zone = Zone(MagicMock(), 1, MagicMock())
+    zone.zone_id = 'zone1'
+    zone.current_state = State.ECO
+    before = ZONE_TRANSITIONS.values.get(State.COMFORT.name, 0)
+    await zone.set_state(State.COMFORT)
+    await zone.set_state(State.COMFORT)
+    assert ZONE_TRANSITIONS.values.get(State.COMFORT.name, 0) == before + 1